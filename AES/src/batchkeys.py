@@ -0,0 +1,74 @@
+'''
+The AES key schedule for many keys at once.
+
+    expand_keys(keys)  -> round keys, shape (N, Nr + 1, 16), uint8
+
+keys is an (N, 16), (N, 24) or (N, 32) uint8 array (or anything NumPy turns into one), one key per
+row.  Row n of the result holds the same round keys as expand_key(bytes(keys[n])), each flattened
+column by column as in matrix_to_bytes, so round key r of every key is result[:, r] and a batched
+AES engine can XOR it into an (N, 16) state directly.
+
+The schedule is the one of expand_key (FIPS-197, 5.2), with every step applied to the words of all
+N keys at the same time: each of the 4 (Nr + 1) words is one NumPy operation on an (N, 4) array,
+and SubWord is a fancy-indexing lookup into the S-box.
+
+Usage (benchmark):
+    python batchkeys.py [number of keys]
+'''
+
+import sys
+import time
+
+from gf256 import S_BOX, xtime
+from naiveAES import N_ROUNDS
+
+_rcon = [1]
+for _ in range(13):
+    _rcon.append(xtime(_rcon[-1]))
+RCON = tuple(_rcon)  # x^(i - 1) in GF(2^8), for the i-th use of the round constant.
+del _rcon
+
+def expand_keys(keys):
+    '''The round keys of every row of keys, as an (N, Nr + 1, 16) uint8 array.'''
+    import numpy as np
+    keys = np.asarray(keys, dtype=np.uint8)
+    if keys.ndim != 2 or keys.shape[1] not in N_ROUNDS:
+        raise ValueError(f"expected an (N, 16), (N, 24) or (N, 32) array of keys, got shape {keys.shape}")
+    n, length = keys.shape
+    nk, n_rounds = length // 4, N_ROUNDS[length]
+    sbox = np.frombuffer(S_BOX, dtype=np.uint8)
+
+    words = np.empty((n, 4 * (n_rounds + 1), 4), dtype=np.uint8)
+    words[:, :nk] = keys.reshape(n, nk, 4)
+    for i in range(nk, 4 * (n_rounds + 1)):
+        temp = words[:, i - 1]
+        if i % nk == 0:
+            temp = sbox[temp[:, [1, 2, 3, 0]]]  # SubWord(RotWord(temp))
+            temp[:, 0] ^= RCON[i // nk - 1]
+        elif nk == 8 and i % nk == 4:
+            temp = sbox[temp]
+        np.bitwise_xor(words[:, i - nk], temp, out=words[:, i])
+    return words.reshape(n, n_rounds + 1, 16)
+
+
+if __name__ == '__main__':
+    import numpy as np
+    from naiveAES import expand_key
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for length in (16, 24, 32):
+        keys = np.random.randint(0, 256, size=(count, length), dtype=np.uint8)
+        start = time.perf_counter()
+        batch = expand_keys(keys)
+        t_batch = time.perf_counter() - start
+
+        sample = min(count, 20000)
+        rows = [bytes(k) for k in keys[:sample]]
+        start = time.perf_counter()
+        scalar = [expand_key(k) for k in rows]
+        t_scalar = time.perf_counter() - start
+        for r, round_keys in enumerate(scalar):
+            if b''.join(b''.join(bytes(w) for w in m) for m in round_keys) != batch[r].tobytes():
+                raise ValueError(f"expand_keys differs from expand_key for key {rows[r].hex()}")
+        print(f"AES-{8 * length}: {count / t_batch:12,.0f} keys/s with expand_keys, "
+              f"{sample / t_scalar:10,.0f} keys/s with expand_key")
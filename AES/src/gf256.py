@@ -0,0 +1,126 @@
+'''
+Arithmetic in GF(2^8) = GF(2)[x]/(x^8 + x^4 + x^3 + x + 1), and the AES tables built from it.
+
+    mul(a, b), inverse(a), xtime(a)      field arithmetic on bytes
+    EXP, LOG                             antilog/log tables to the generator 3
+    S_BOX, INV_S_BOX                     the AES S-box and its inverse
+    MUL[c]                               c * a for every byte a, for the MixColumns constants
+    TE, TD                               the four encryption and decryption T-tables
+
+A byte is a polynomial over GF(2) (bit i is the coefficient of x^i).  3 = x + 1 generates the
+multiplicative group, so every nonzero a is 3^LOG[a], a * b = EXP[LOG[a] + LOG[b]] and
+1/a = EXP[255 - LOG[a]]; EXP is stored twice over so that sums of two logs need no reduction.
+
+The S-box is the inverse (with 0 -> 0) followed by the affine map
+b -> b + (b <<< 1) + (b <<< 2) + (b <<< 3) + (b <<< 4) + 0x63 (FIPS-197, 5.1.1).  A T-table
+entry is the MixColumns column of one S-box output, as a 32-bit word: TE[0][a] is
+(2 S[a], S[a], S[a], 3 S[a]), and TE[k] is TE[0] rotated right by k bytes.  TD does the same
+with the inverse S-box and (14, 9, 13, 11).
+
+Everything is computed at import; self_check() compares it with the values printed in FIPS-197.
+
+Usage:
+    python gf256.py
+'''
+
+import struct
+
+POLY = 0x11B  # x^8 + x^4 + x^3 + x + 1
+GENERATOR = 3
+
+def xtime(a):
+    '''a * x.'''
+    return (a << 1) ^ POLY if a & 0x80 else a << 1
+
+EXP = [0] * 510
+LOG = [0] * 256
+_a = 1
+for _i in range(255):
+    EXP[_i] = EXP[_i + 255] = _a
+    LOG[_a] = _i
+    _a ^= xtime(_a)  # a * (x + 1)
+
+def mul(a, b):
+    '''a * b.'''
+    if a == 0 or b == 0:
+        return 0
+    return EXP[LOG[a] + LOG[b]]
+
+def inverse(a):
+    '''1/a, with 0 mapped to 0 as in the S-box.'''
+    return EXP[255 - LOG[a]] if a else 0
+
+def _affine(b):
+    t = b ^ (b << 1) ^ (b << 2) ^ (b << 3) ^ (b << 4)
+    return (t ^ (t >> 8)) & 0xFF ^ 0x63
+
+S_BOX = bytes(_affine(inverse(a)) for a in range(256))
+INV_S_BOX = bytes(sorted(range(256), key=S_BOX.__getitem__))
+
+# Multiples by the MixColumns constants, composed from xtime with bytes.translate (table[table[a]]).
+def _xor(*tables):
+    x = 0
+    for t in tables:
+        x ^= int.from_bytes(t, 'big')
+    return x.to_bytes(256, 'big')
+
+_one = bytes(range(256))
+_two = bytes(xtime(a) for a in range(256))
+_four = _two.translate(_two)
+_eight = _four.translate(_two)
+MUL = {2: _two, 3: _xor(_two, _one), 9: _xor(_eight, _one), 11: _xor(_eight, _two, _one),
+       13: _xor(_eight, _four, _one), 14: _xor(_eight, _four, _two)}
+
+def _t_tables(box, constants):
+    # Byte j of every word is c_j * box[a]: interleave the four columns, rotated by k for TE[k].
+    columns = [box.translate(MUL[c]) if c != 1 else box for c in constants]
+    tables = []
+    for k in range(4):
+        words = bytearray(1024)
+        for j, column in enumerate(columns):
+            words[(j + k) % 4::4] = column
+        tables.append(struct.unpack('>256I', words))
+    return tuple(tables)
+
+TE = _t_tables(S_BOX, (2, 1, 1, 3))
+TD = _t_tables(INV_S_BOX, (14, 9, 13, 11))
+
+del _a, _i, _one, _two, _four, _eight
+
+def self_check():
+    '''Compare the tables with the values given in FIPS-197; raise ValueError on a mismatch.'''
+    checks = [
+        ('{57} * {83}', mul(0x57, 0x83), 0xC1),  # 4.2
+        ('xtime({57})', xtime(0x57), 0xAE),  # 4.2.1
+        ('{57} * {13}', mul(0x57, 0x13), 0xFE),  # 4.2.1
+        ('S-box row 0', S_BOX[:16], bytes.fromhex('637c777bf26b6fc53001672bfed7ab76')),  # Figure 7
+        ('S-box {53}', S_BOX[0x53], 0xED),  # 5.1.1
+        ('S-box row f', S_BOX[0xF0:], bytes.fromhex('8ca1890dbfe6426841992d0fb054bb16')),
+        ('inverse S-box row 0', INV_S_BOX[:16], bytes.fromhex('52096ad53036a538bf40a39e81f3d7fb')),  # Figure 14
+        ('inverse S-box row f', INV_S_BOX[0xF0:], bytes.fromhex('172b047eba77d626e169146355210c7d')),
+        ('inverse of {53}', inverse(0x53), 0xCA),  # 5.1.1
+        ('TE[0][0]', TE[0][0], 0xC66363A5),
+        ('TD[0][0]', TD[0][0], 0x51F4A750),
+    ]
+    for name, got, expected in checks:
+        if bytes(got) != bytes(expected) if isinstance(expected, bytes) else got != expected:
+            raise ValueError(f"GF(2^8) tables: {name} is {got}, FIPS-197 says {expected}")
+    if any(mul(a, inverse(a)) != 1 for a in range(1, 256)):
+        raise ValueError("GF(2^8) tables: some a * (1/a) != 1")
+    if any(INV_S_BOX[S_BOX[a]] != a for a in range(256)):
+        raise ValueError("GF(2^8) tables: the inverse S-box does not invert the S-box")
+
+
+if __name__ == '__main__':
+    import time
+
+    self_check()
+    print("GF(2^8) and AES tables match FIPS-197.")
+    # Building every table is running this module's code once more.
+    with open(__file__) as f:
+        code = compile(f.read(), __file__, 'exec')
+    runs = 100
+    start = time.perf_counter()
+    for _ in range(runs):
+        exec(code, {'__name__': 'gf256'})
+    print(f"Building every table takes {1000 * (time.perf_counter() - start) / runs:.2f} ms")
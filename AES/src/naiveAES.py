@@ -1,4 +1,7 @@
-from Crypto.Cipher import AES as PyCryptoAES
+# The S-boxes and xtime come from GF(2^8) arithmetic, computed at import (see gf256.py).
+from gf256 import INV_S_BOX as inv_s_box, S_BOX as s_box, xtime
+
+N_ROUNDS = {16: 10, 24: 12, 32: 14}  # Rounds for each key length in bytes (FIPS-197, 5).
 
 
 class AESBlock:
@@ -6,12 +9,21 @@ class AESBlock:
         self.key = key
         self.n_rounds = n_rounds
 
-    def encrypt(self, plaintext, key=None):
-        if key is None:
-            key = self.key
+    @property
+    def key(self):
+        return self._key
+
+    @key.setter
+    def key(self, key):
+        # Modes of operation encrypt many blocks under one key: expand it once, when it is set.
+        self._key = bytes(key)
+        self._round_keys = _round_keys(self._key)
 
-        # Expand key
-        round_keys = expand_key(key)
+    def _round_keys_for(self, key):
+        return self._round_keys if key is None else _round_keys(bytes(key))
+
+    def encrypt(self, plaintext, key=None):
+        round_keys = self._round_keys_for(key)
         # Convert ciphertext to state matrix
         state = bytes_to_matrix(plaintext)
         # Initial add round key step
@@ -33,12 +45,8 @@ class AESBlock:
         return ciphertext
 
     def decrypt(self, ciphertext, key=None):
-        if key is None:
-            key = self.key
-
-        round_keys = expand_key(
-            key
-        )  # Remember to start from the last round key and work backwards through them when decrypting
+        # Remember to start from the last round key and work backwards through them when decrypting
+        round_keys = self._round_keys_for(key)
         # Convert ciphertext to state matrix
         state = bytes_to_matrix(ciphertext)
         # Initial add round key step
@@ -61,6 +69,7 @@ def expand_key(master_key):
     """
     Expands and returns a list of key matrices for the given master_key.
     """
+    n_rounds = N_ROUNDS[len(master_key)]
 
     # Round constants https://en.wikipedia.org/wiki/AES_key_schedule#Round_constants
     r_con = (
@@ -131,6 +140,11 @@ def expand_key(master_key):
     return [key_columns[4 * i : 4 * (i + 1)] for i in range(len(key_columns) // 4)]
 
 
+def _round_keys(key):
+    '''The round keys of expand_key as tuples of bytes words, so that no caller can change them.'''
+    return tuple(tuple(bytes(word) for word in matrix) for matrix in expand_key(key))
+
+
 def bytes_to_matrix(text):
     """Converts a 16-byte array into a 4x4 matrix."""
     return [list(text[i : i + 4]) for i in range(0, len(text), 4)]
@@ -141,540 +155,6 @@ def matrix_to_bytes(matrix):
     return bytes(sum(matrix, []))
 
 
-
-s_box = (
-    0x63,
-    0x7C,
-    0x77,
-    0x7B,
-    0xF2,
-    0x6B,
-    0x6F,
-    0xC5,
-    0x30,
-    0x01,
-    0x67,
-    0x2B,
-    0xFE,
-    0xD7,
-    0xAB,
-    0x76,
-    0xCA,
-    0x82,
-    0xC9,
-    0x7D,
-    0xFA,
-    0x59,
-    0x47,
-    0xF0,
-    0xAD,
-    0xD4,
-    0xA2,
-    0xAF,
-    0x9C,
-    0xA4,
-    0x72,
-    0xC0,
-    0xB7,
-    0xFD,
-    0x93,
-    0x26,
-    0x36,
-    0x3F,
-    0xF7,
-    0xCC,
-    0x34,
-    0xA5,
-    0xE5,
-    0xF1,
-    0x71,
-    0xD8,
-    0x31,
-    0x15,
-    0x04,
-    0xC7,
-    0x23,
-    0xC3,
-    0x18,
-    0x96,
-    0x05,
-    0x9A,
-    0x07,
-    0x12,
-    0x80,
-    0xE2,
-    0xEB,
-    0x27,
-    0xB2,
-    0x75,
-    0x09,
-    0x83,
-    0x2C,
-    0x1A,
-    0x1B,
-    0x6E,
-    0x5A,
-    0xA0,
-    0x52,
-    0x3B,
-    0xD6,
-    0xB3,
-    0x29,
-    0xE3,
-    0x2F,
-    0x84,
-    0x53,
-    0xD1,
-    0x00,
-    0xED,
-    0x20,
-    0xFC,
-    0xB1,
-    0x5B,
-    0x6A,
-    0xCB,
-    0xBE,
-    0x39,
-    0x4A,
-    0x4C,
-    0x58,
-    0xCF,
-    0xD0,
-    0xEF,
-    0xAA,
-    0xFB,
-    0x43,
-    0x4D,
-    0x33,
-    0x85,
-    0x45,
-    0xF9,
-    0x02,
-    0x7F,
-    0x50,
-    0x3C,
-    0x9F,
-    0xA8,
-    0x51,
-    0xA3,
-    0x40,
-    0x8F,
-    0x92,
-    0x9D,
-    0x38,
-    0xF5,
-    0xBC,
-    0xB6,
-    0xDA,
-    0x21,
-    0x10,
-    0xFF,
-    0xF3,
-    0xD2,
-    0xCD,
-    0x0C,
-    0x13,
-    0xEC,
-    0x5F,
-    0x97,
-    0x44,
-    0x17,
-    0xC4,
-    0xA7,
-    0x7E,
-    0x3D,
-    0x64,
-    0x5D,
-    0x19,
-    0x73,
-    0x60,
-    0x81,
-    0x4F,
-    0xDC,
-    0x22,
-    0x2A,
-    0x90,
-    0x88,
-    0x46,
-    0xEE,
-    0xB8,
-    0x14,
-    0xDE,
-    0x5E,
-    0x0B,
-    0xDB,
-    0xE0,
-    0x32,
-    0x3A,
-    0x0A,
-    0x49,
-    0x06,
-    0x24,
-    0x5C,
-    0xC2,
-    0xD3,
-    0xAC,
-    0x62,
-    0x91,
-    0x95,
-    0xE4,
-    0x79,
-    0xE7,
-    0xC8,
-    0x37,
-    0x6D,
-    0x8D,
-    0xD5,
-    0x4E,
-    0xA9,
-    0x6C,
-    0x56,
-    0xF4,
-    0xEA,
-    0x65,
-    0x7A,
-    0xAE,
-    0x08,
-    0xBA,
-    0x78,
-    0x25,
-    0x2E,
-    0x1C,
-    0xA6,
-    0xB4,
-    0xC6,
-    0xE8,
-    0xDD,
-    0x74,
-    0x1F,
-    0x4B,
-    0xBD,
-    0x8B,
-    0x8A,
-    0x70,
-    0x3E,
-    0xB5,
-    0x66,
-    0x48,
-    0x03,
-    0xF6,
-    0x0E,
-    0x61,
-    0x35,
-    0x57,
-    0xB9,
-    0x86,
-    0xC1,
-    0x1D,
-    0x9E,
-    0xE1,
-    0xF8,
-    0x98,
-    0x11,
-    0x69,
-    0xD9,
-    0x8E,
-    0x94,
-    0x9B,
-    0x1E,
-    0x87,
-    0xE9,
-    0xCE,
-    0x55,
-    0x28,
-    0xDF,
-    0x8C,
-    0xA1,
-    0x89,
-    0x0D,
-    0xBF,
-    0xE6,
-    0x42,
-    0x68,
-    0x41,
-    0x99,
-    0x2D,
-    0x0F,
-    0xB0,
-    0x54,
-    0xBB,
-    0x16,
-)
-
-inv_s_box = (
-    0x52,
-    0x09,
-    0x6A,
-    0xD5,
-    0x30,
-    0x36,
-    0xA5,
-    0x38,
-    0xBF,
-    0x40,
-    0xA3,
-    0x9E,
-    0x81,
-    0xF3,
-    0xD7,
-    0xFB,
-    0x7C,
-    0xE3,
-    0x39,
-    0x82,
-    0x9B,
-    0x2F,
-    0xFF,
-    0x87,
-    0x34,
-    0x8E,
-    0x43,
-    0x44,
-    0xC4,
-    0xDE,
-    0xE9,
-    0xCB,
-    0x54,
-    0x7B,
-    0x94,
-    0x32,
-    0xA6,
-    0xC2,
-    0x23,
-    0x3D,
-    0xEE,
-    0x4C,
-    0x95,
-    0x0B,
-    0x42,
-    0xFA,
-    0xC3,
-    0x4E,
-    0x08,
-    0x2E,
-    0xA1,
-    0x66,
-    0x28,
-    0xD9,
-    0x24,
-    0xB2,
-    0x76,
-    0x5B,
-    0xA2,
-    0x49,
-    0x6D,
-    0x8B,
-    0xD1,
-    0x25,
-    0x72,
-    0xF8,
-    0xF6,
-    0x64,
-    0x86,
-    0x68,
-    0x98,
-    0x16,
-    0xD4,
-    0xA4,
-    0x5C,
-    0xCC,
-    0x5D,
-    0x65,
-    0xB6,
-    0x92,
-    0x6C,
-    0x70,
-    0x48,
-    0x50,
-    0xFD,
-    0xED,
-    0xB9,
-    0xDA,
-    0x5E,
-    0x15,
-    0x46,
-    0x57,
-    0xA7,
-    0x8D,
-    0x9D,
-    0x84,
-    0x90,
-    0xD8,
-    0xAB,
-    0x00,
-    0x8C,
-    0xBC,
-    0xD3,
-    0x0A,
-    0xF7,
-    0xE4,
-    0x58,
-    0x05,
-    0xB8,
-    0xB3,
-    0x45,
-    0x06,
-    0xD0,
-    0x2C,
-    0x1E,
-    0x8F,
-    0xCA,
-    0x3F,
-    0x0F,
-    0x02,
-    0xC1,
-    0xAF,
-    0xBD,
-    0x03,
-    0x01,
-    0x13,
-    0x8A,
-    0x6B,
-    0x3A,
-    0x91,
-    0x11,
-    0x41,
-    0x4F,
-    0x67,
-    0xDC,
-    0xEA,
-    0x97,
-    0xF2,
-    0xCF,
-    0xCE,
-    0xF0,
-    0xB4,
-    0xE6,
-    0x73,
-    0x96,
-    0xAC,
-    0x74,
-    0x22,
-    0xE7,
-    0xAD,
-    0x35,
-    0x85,
-    0xE2,
-    0xF9,
-    0x37,
-    0xE8,
-    0x1C,
-    0x75,
-    0xDF,
-    0x6E,
-    0x47,
-    0xF1,
-    0x1A,
-    0x71,
-    0x1D,
-    0x29,
-    0xC5,
-    0x89,
-    0x6F,
-    0xB7,
-    0x62,
-    0x0E,
-    0xAA,
-    0x18,
-    0xBE,
-    0x1B,
-    0xFC,
-    0x56,
-    0x3E,
-    0x4B,
-    0xC6,
-    0xD2,
-    0x79,
-    0x20,
-    0x9A,
-    0xDB,
-    0xC0,
-    0xFE,
-    0x78,
-    0xCD,
-    0x5A,
-    0xF4,
-    0x1F,
-    0xDD,
-    0xA8,
-    0x33,
-    0x88,
-    0x07,
-    0xC7,
-    0x31,
-    0xB1,
-    0x12,
-    0x10,
-    0x59,
-    0x27,
-    0x80,
-    0xEC,
-    0x5F,
-    0x60,
-    0x51,
-    0x7F,
-    0xA9,
-    0x19,
-    0xB5,
-    0x4A,
-    0x0D,
-    0x2D,
-    0xE5,
-    0x7A,
-    0x9F,
-    0x93,
-    0xC9,
-    0x9C,
-    0xEF,
-    0xA0,
-    0xE0,
-    0x3B,
-    0x4D,
-    0xAE,
-    0x2A,
-    0xF5,
-    0xB0,
-    0xC8,
-    0xEB,
-    0xBB,
-    0x3C,
-    0x83,
-    0x53,
-    0x99,
-    0x61,
-    0x17,
-    0x2B,
-    0x04,
-    0x7E,
-    0xBA,
-    0x77,
-    0xD6,
-    0x26,
-    0xE1,
-    0x69,
-    0x14,
-    0x63,
-    0x55,
-    0x21,
-    0x0C,
-    0x7D,
-)
-
-
-def lookup_function(x):
-    return (
-        0x05 * pow(x, 0xFE)
-        + 0x09 * pow(x, 0xFD)
-        + 0xF9 * pow(x, 0xFB)
-        + 0x25 * pow(x, 0xF7)
-        + 0xF4 * pow(x, 0xEF)
-        + 0x01 * pow(x, 0xDF)
-        + 0xB5 * pow(x, 0xBF)
-        + 0x8F * pow(x, 0x7F)
-        + 63
-    )
-
-
 def sub_bytes(s, sbox):
     l = []
     for i in s:
@@ -699,10 +179,6 @@ def inv_shift_rows(s):
     return s
 
 
-# learned from http://cs.ucsb.edu/~koc/cs178/projects/JT/aes.c
-xtime = lambda a: (((a << 1) ^ 0x1B) & 0xFF) if (a & 0x80) else (a << 1)
-
-
 def mix_single_column(a):
     # see Sec 4.1.2 in The Design of Rijndael
     t = a[0] ^ a[1] ^ a[2] ^ a[3]
@@ -733,34 +209,51 @@ def inv_mix_columns(s):
     return s
 
 
-key = b"some 16 byte key"
-m = b"some 16 byte msg"
-# print(len(m))
-
-n_rounds = 10
-
-cipher = AESBlock(key)
-c = cipher.encrypt(m)
-print(c)
-m_decr = cipher.decrypt(c)
-print(m_decr)
-print(m == m_decr)
-
-############# OUTPUT ############
-# key = b"some 16 byte key"
-# m = b"some 16 byte msg"
-# CIPHERTEXT: b'\xceB6\xc5J\xc0\xbe\x17w\x04\xdezq\x97\xb5\xca'
-# ORIGINAL MESSAGE: b'some 16 byte msg'
-# DECRYPTED MESSAGE EQUAL WITH ORIGINAL MESSAGE: True
-
-# Encrypt using PyCryptodome (AES-128 in ECB mode)
-cipher = PyCryptoAES.new(key=key, mode=PyCryptoAES.MODE_ECB)
-ref_cipher = cipher.encrypt(m)
-ref_decrypt = cipher.decrypt(ref_cipher)
-
-# Show results
-ref_cipher.hex(), ref_decrypt, m == ref_decrypt
-
-print("Custom:", c.hex())
-print("Ref   :", ref_cipher.hex())
-print("Match :", c == ref_cipher)
\ No newline at end of file
+if __name__ == '__main__':
+    from gf256 import self_check
+
+    # FIPS-197: the tables, then the example vectors of Appendix C for the three key sizes.
+    self_check()
+    fips_plaintext = bytes.fromhex("00112233445566778899aabbccddeeff")
+    for fips_key, n_rounds, expected in (
+        ("000102030405060708090a0b0c0d0e0f", 10, "69c4e0d86a7b0430d8cdb78070b4c55a"),
+        ("000102030405060708090a0b0c0d0e0f1011121314151617", 12, "dda97ca4864cdfe06eaf70a0ec0d7191"),
+        ("000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f", 14, "8ea2b7ca516745bfeafc49904b496089"),
+    ):
+        fips_cipher = AESBlock(bytes.fromhex(fips_key), n_rounds)
+        if fips_cipher.encrypt(fips_plaintext).hex() != expected or \
+                fips_cipher.decrypt(bytes.fromhex(expected)) != fips_plaintext:
+            raise ValueError(f"AES-{4 * len(fips_key)} does not match FIPS-197 Appendix C")
+    print("FIPS-197 Appendix C vectors: OK")
+
+    key = b"some 16 byte key"
+    m = b"some 16 byte msg"
+    # print(len(m))
+
+    cipher = AESBlock(key)
+    c = cipher.encrypt(m)
+    print(c)
+    m_decr = cipher.decrypt(c)
+    print(m_decr)
+    print(m == m_decr)
+
+    ############# OUTPUT ############
+    # key = b"some 16 byte key"
+    # m = b"some 16 byte msg"
+    # CIPHERTEXT: b'\xceB6\xc5J\xc0\xbe\x17w\x04\xdezq\x97\xb5\xca'
+    # ORIGINAL MESSAGE: b'some 16 byte msg'
+    # DECRYPTED MESSAGE EQUAL WITH ORIGINAL MESSAGE: True
+
+    # Encrypt using PyCryptodome (AES-128 in ECB mode)
+    from Crypto.Cipher import AES as PyCryptoAES
+
+    cipher = PyCryptoAES.new(key=key, mode=PyCryptoAES.MODE_ECB)
+    ref_cipher = cipher.encrypt(m)
+    ref_decrypt = cipher.decrypt(ref_cipher)
+
+    # Show results
+    ref_cipher.hex(), ref_decrypt, m == ref_decrypt
+
+    print("Custom:", c.hex())
+    print("Ref   :", ref_cipher.hex())
+    print("Match :", c == ref_cipher)
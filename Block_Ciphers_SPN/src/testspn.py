@@ -129,7 +129,7 @@ class SPN:
             w = permute(v, self.pbox, self.block_size)
 
         u = w ^ ks[-2]
-        v = substitute(u, S, self.l)
+        v = substitute(u, self.sbox, self.l)
         y = v ^ ks[-1]
 
         return y
@@ -148,15 +148,17 @@ class SPN:
             w = u ^ ki
         return w
 
-S = [14, 4, 13, 1, 2, 15, 11, 8, 3, 10, 6, 12, 5, 9, 0, 7]
-P = [0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15]
-m = 0b0010_0110_1011_0111  # message
-K = 0b0011_1010_1001_0100_1101_0110_0011_1111
-print(K.bit_length())
 
-spn_network(m, K, S, P, verbose=True)
-spn = SPN(S, P)
-c = spn.encrypt(m, K)
-print(c)
+if __name__ == '__main__':
+    S = [14, 4, 13, 1, 2, 15, 11, 8, 3, 10, 6, 12, 5, 9, 0, 7]
+    P = [0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15]
+    m = 0b0010_0110_1011_0111  # message
+    K = 0b0011_1010_1001_0100_1101_0110_0011_1111
+    print(K.bit_length())
 
-m == spn.decrypt(c, K)
\ No newline at end of file
+    spn_network(m, K, S, P, verbose=True)
+    spn = SPN(S, P)
+    c = spn.encrypt(m, K)
+    print(c)
+
+    m == spn.decrypt(c, K)
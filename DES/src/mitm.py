@@ -0,0 +1,383 @@
+'''
+Meet-in-the-middle attack on double encryption, c = E_k2(E_k1(m)), for DES and for the toy SPN.
+
+    attack(DoubleSPN(), pairs)                 -> every (k1, k2) consistent with the known pairs
+    attack(DoubleDES(key_bits=16), pairs)      -> the same over a reduced DES keyspace
+
+Double encryption with two n-bit keys costs 2^(2n) by brute force, but only about 2^(n+1) this way:
+
+1. Encrypt the known plaintext(s) under every first key and store (middle value, k1) in a table.
+2. Sort the table by middle value.  It is a NumPy structured array in a memory-mapped file, so
+   it can be larger than memory: it is sorted by partitioning on the top bits of the middle value
+   (one counting pass and one scattering pass over the file), then sorting each partition alone.
+3. Decrypt the known ciphertext(s) under every second key, and binary-search each result in the
+   table.  The search is vectorized over a chunk of keys and reads only the entries it visits.
+4. Check every candidate (k1, k2) against all the known pairs.
+
+Both stages, and the sorting of the partitions, run in a process pool: every task is a range of
+keys (or partitions), and the workers read and write disjoint parts of the memory-mapped file.
+
+The SPN of Block_Ciphers_SPN (testspn.py) has 16-bit blocks and 32-bit keys; DoubleSPN runs the
+same network from its S-box and P-box.  A single 16-bit middle value would leave 2^48 false
+candidates, so the middle value packs the encryptions of up to four plaintexts into 64 bits.  Its
+rounds are NumPy lookups in 2^16-entry substitution and permutation tables, applied to a whole
+chunk of keys at once, so the full 2 x 32-bit keyspace is within reach (a table of 2^32 entries,
+64 GB on disk).  The DES class works on bit strings and takes milliseconds per key, so DoubleDES
+varies only key_bits of the 56 effective key bits (the parity bits are skipped).
+
+Usage:
+    python mitm.py [SPN key bits] [DES key bits]
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from wholesomeDES import DES, int_to_bin
+
+TABLE_DTYPE = [('mid', '<u8'), ('key', '<u8')]
+SORT_CHUNK = 1 << 22  # Table entries handled at once while sorting (64 MB).
+
+SPN_SBOX = [14, 4, 13, 1, 2, 15, 11, 8, 3, 10, 6, 12, 5, 9, 0, 7]
+SPN_PBOX = [0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15]
+
+############################  The ciphers
+
+class DoubleSPN:
+    '''
+    Double encryption with the SPN of testspn.py, first and second keys in [0, 2^key_bits).
+    forward/backward map a NumPy array of key indices to the packed middle values, left-aligned in
+    64 bits when there are fewer than packed known pairs.
+    '''
+    block_bits = 16
+    packed = 4  # Plaintexts packed into one 64-bit middle value.
+    chunk = 1 << 20  # Keys per task.
+
+    def __init__(self, sbox=SPN_SBOX, pbox=SPN_PBOX, key_bits=32):
+        self.sbox, self.pbox = list(sbox), list(pbox)
+        self.key_bits = key_bits
+        self.size = 1 << key_bits
+        self._tables = None
+
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if key != '_tables'}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _tables=None)
+
+    def key(self, i):
+        return i
+
+    def encrypt(self, k, m):
+        sub, perm, _, _ = self.tables()
+        ks = [k >> 4 * i & 0xFFFF for i in range(4, -1, -1)]
+        w = m
+        for ki in ks[:-2]:
+            w = int(perm[sub[w ^ ki]])
+        return int(sub[w ^ ks[-2]]) ^ ks[-1]
+
+    def decrypt(self, k, c):
+        _, _, inv_sub, inv_perm = self.tables()
+        ks = [k >> 4 * i & 0xFFFF for i in range(4, -1, -1)]
+        w = int(inv_sub[c ^ ks[-1]]) ^ ks[-2]
+        for ki in ks[-3::-1]:
+            w = int(inv_sub[inv_perm[w]]) ^ ki
+        return w
+
+    def tables(self):
+        '''Substitution and permutation of every 16-bit word, and their inverses.'''
+        import numpy as np
+        if self._tables is None:
+            u = np.arange(1 << 16, dtype=np.uint32)
+            S = np.array(self.sbox, dtype=np.uint32)
+            sub = S[u >> 12] << 12 | S[u >> 8 & 15] << 8 | S[u >> 4 & 15] << 4 | S[u & 15]
+            perm = np.zeros_like(u)
+            for j, p in enumerate(self.pbox):  # Bit j of the output (from the top) is bit p of the input.
+                perm |= (u >> (15 - p) & 1) << (15 - j)
+            inv_sub, inv_perm = np.empty_like(u), np.empty_like(u)
+            inv_sub[sub], inv_perm[perm] = u, u
+            self._tables = tuple(t.astype(np.uint16) for t in (sub, perm, inv_sub, inv_perm))
+        return self._tables
+
+    def _round_keys(self, keys):
+        import numpy as np
+        keys = keys.astype(np.uint64)
+        return [(keys >> np.uint64(4 * i) & np.uint64(0xFFFF)).astype(np.uint16) for i in range(4, -1, -1)]
+
+    def forward(self, keys, plaintexts):
+        import numpy as np
+        sub, perm, _, _ = self.tables()
+        ks = self._round_keys(keys)
+        mid = np.zeros(len(keys), dtype=np.uint64)
+        for m in plaintexts[:self.packed]:
+            w = np.full(len(keys), m, dtype=np.uint16)
+            for k in ks[:-2]:
+                w = perm[sub[w ^ k]]
+            y = sub[w ^ ks[-2]] ^ ks[-1]
+            mid = mid << np.uint64(16) | y
+        return self._align(mid, plaintexts)
+
+    def backward(self, keys, ciphertexts):
+        import numpy as np
+        _, _, inv_sub, inv_perm = self.tables()
+        ks = self._round_keys(keys)
+        mid = np.zeros(len(keys), dtype=np.uint64)
+        for c in ciphertexts[:self.packed]:
+            w = inv_sub[np.uint16(c) ^ ks[-1]] ^ ks[-2]
+            for k in ks[-3::-1]:
+                w = inv_sub[inv_perm[w]] ^ k
+            mid = mid << np.uint64(16) | w
+        return self._align(mid, ciphertexts)
+
+    def _align(self, mid, blocks):
+        '''Shift fewer than packed middle values to the top of the word, where the sort partitions.'''
+        import numpy as np
+        return mid << np.uint64(self.block_bits * (self.packed - len(blocks[:self.packed])))
+
+class DoubleDES:
+    '''
+    Double encryption with the DES class, over keys that differ from base_key only in the lowest
+    key_bits effective (non-parity) bits: key i is base_key with those bits XORed with i.  The
+    blocks are 64-bit integers.  The round function of the class is a % k, so base_key should not
+    let a key come out 0 (the default is the key of the classic worked DES example).
+    '''
+    block_bits = 64
+    packed = 1
+    chunk = 1 << 8
+
+    def __init__(self, key_bits=16, base_key=0x133457799BBCDFF1):
+        if not 0 < key_bits <= 56:
+            raise ValueError("DES has 56 effective key bits")
+        self.key_bits = key_bits
+        self.size = 1 << key_bits
+        # Bit 0 of every key byte is a parity bit, dropped by PC-1.
+        self.positions = [bit for bit in range(64) if bit % 8][:key_bits]
+        self.base_key = base_key
+
+    def key(self, i):
+        k = self.base_key
+        for j, bit in enumerate(self.positions):
+            k ^= (i >> j & 1) << bit
+        return k
+
+    def encrypt(self, k, m):
+        return int(DES(k).encrypt(int_to_bin(m, block_size=64)), base=2)
+
+    def decrypt(self, k, c):
+        return int(DES(k).decrypt(int_to_bin(c, block_size=64)), base=2)
+
+    def forward(self, keys, plaintexts):
+        import numpy as np
+        return np.array([self.encrypt(self.key(int(i)), plaintexts[0]) for i in keys], dtype=np.uint64)
+
+    def backward(self, keys, ciphertexts):
+        import numpy as np
+        return np.array([self.decrypt(self.key(int(i)), ciphertexts[0]) for i in keys], dtype=np.uint64)
+
+############################  The table
+
+def _open(path, size, mode='r'):
+    import numpy as np
+    return np.memmap(path, dtype=TABLE_DTYPE, mode=mode, shape=(size,))
+
+def _forward_task(cipher, plaintexts, path, start, stop):
+    import numpy as np
+    table = _open(path, cipher.size, 'r+')
+    keys = np.arange(start, stop, dtype=np.uint64)
+    table['mid'][start:stop] = cipher.forward(keys, plaintexts)
+    table['key'][start:stop] = keys
+    table.flush()
+
+def _sort_task(path, size, bounds):
+    '''Sort the partitions table[bounds[0]:bounds[1]], table[bounds[1]:bounds[2]], ... by middle value.'''
+    import numpy as np
+    table = _open(path, size, 'r+')
+    for lo, hi in zip(bounds, bounds[1:]):
+        part = table[lo:hi]
+        table[lo:hi] = part[np.argsort(part['mid'], kind='stable')]
+    table.flush()
+
+def _sort(path, size, run, sort_chunk=SORT_CHUNK):
+    '''
+    Sort the table file by middle value, in memory of O(sort_chunk) entries as long as the top bits
+    of the middle values are spread out.  Returns the size of the largest partition.
+    '''
+    import numpy as np
+    top = max(0, min(16, (size - 1).bit_length() - sort_chunk.bit_length() + 2))
+    if top == 0:
+        _sort_task(path, size, [0, size])
+        return size
+    shift = np.uint64(64 - top)
+    table = _open(path, size)
+    counts = np.zeros(1 << top, dtype=np.int64)
+    for i in range(0, size, sort_chunk):
+        counts += np.bincount((table['mid'][i:i + sort_chunk] >> shift).astype(np.int64), minlength=1 << top)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+
+    # Scatter every chunk into its partitions of a second file, then replace the table with it.
+    partitioned_path = f"{path}.partitioned"
+    out = _open(partitioned_path, size, 'w+')
+    fill = starts[:-1].copy()
+    for i in range(0, size, sort_chunk):
+        chunk = np.array(table[i:i + sort_chunk])
+        bucket = (chunk['mid'] >> shift).astype(np.int64)
+        order = np.argsort(bucket, kind='stable')
+        chunk, bucket = chunk[order], bucket[order]
+        in_chunk = np.bincount(bucket, minlength=1 << top)
+        rank = np.arange(len(chunk)) - (np.cumsum(in_chunk) - in_chunk)[bucket]
+        out[fill[bucket] + rank] = chunk
+        fill += in_chunk
+    out.flush()
+    del table, out
+    os.replace(partitioned_path, path)
+
+    # Sort the partitions, in groups of about sort_chunk entries.
+    groups, first = [], 0
+    for b in range(1, len(starts)):
+        if starts[b] - starts[first] >= sort_chunk or b == len(starts) - 1:
+            groups.append(starts[first:b + 1].tolist())
+            first = b
+    run(_sort_task, [(path, size, bounds) for bounds in groups])
+    return int(counts.max())
+
+def _search(mids, values):
+    '''The leftmost position of each value in the sorted array mids, found by a vectorized binary search.'''
+    import numpy as np
+    lo = np.zeros(len(values), dtype=np.int64)
+    hi = np.full(len(values), len(mids), dtype=np.int64)
+    active = lo < hi
+    while active.any():
+        middle = (lo + hi) // 2
+        below = active & (mids[np.minimum(middle, len(mids) - 1)] < values)  # Reads only the visited entries.
+        lo = np.where(below, middle + 1, lo)
+        hi = np.where(active & ~below, middle, hi)
+        active = lo < hi
+    return lo
+
+def _match_task(cipher, ciphertexts, path, start, stop):
+    '''The candidate (k1 index, k2 index) pairs for the second keys in [start, stop).'''
+    import numpy as np
+    table = _open(path, cipher.size)
+    mids = table['mid']
+    keys = np.arange(start, stop, dtype=np.uint64)
+    values = cipher.backward(keys, ciphertexts)
+    positions = _search(mids, values)
+    found = positions < len(mids)
+    found[found] = mids[positions[found]] == values[found]
+    candidates = []
+    for j in np.flatnonzero(found):
+        p = positions[j]
+        while p < len(mids) and mids[p] == values[j]:
+            candidates.append((int(table['key'][p]), int(keys[j])))
+            p += 1
+    return candidates
+
+############################  The attack
+
+def attack(cipher, pairs, workdir=None, max_workers=None, stats=None, sort_chunk=SORT_CHUNK):
+    '''
+    Every key pair (k1, k2) of cipher with E_k2(E_k1(m)) == c for all the known (m, c) in pairs.
+    The table is kept in workdir (a temporary directory by default, removed afterwards), and the
+    work is spread over max_workers processes (one per core by default), and the sort handles
+    sort_chunk table entries at a time.  If stats is a dictionary, it is filled with the seconds per
+    stage, the table size, the largest partition sorted in memory and the number of candidates.
+    '''
+    plaintexts = [m for m, _ in pairs]
+    ciphertexts = [c for _, c in pairs]
+    workers = max_workers or os.cpu_count() or 1
+    own_dir = workdir is None
+    workdir = tempfile.mkdtemp() if own_dir else workdir
+    path = os.path.join(workdir, f"mitm_{type(cipher).__name__}_{cipher.key_bits}.table")
+    chunks = [(start, min(start + cipher.chunk, cipher.size)) for start in range(0, cipher.size, cipher.chunk)]
+    timings = {}
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else _Inline() as pool:
+            def run(task, arguments):
+                return [f.result() for f in [pool.submit(task, *a) for a in arguments]]
+
+            start = time.perf_counter()
+            _open(path, cipher.size, 'w+').flush()
+            run(_forward_task, [(cipher, plaintexts, path, a, b) for a, b in chunks])
+            timings['forward'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            largest = _sort(path, cipher.size, run, sort_chunk)
+            timings['sort'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            candidates = [c for part in run(_match_task, [(cipher, ciphertexts, path, a, b) for a, b in chunks])
+                          for c in part]
+            timings['backward'] = time.perf_counter() - start
+    finally:
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    start = time.perf_counter()
+    keys = []
+    for i1, i2 in candidates:
+        k1, k2 = cipher.key(i1), cipher.key(i2)
+        if all(cipher.encrypt(k2, cipher.encrypt(k1, m)) == c for m, c in pairs):
+            keys.append((k1, k2))
+    timings['verify'] = time.perf_counter() - start
+    if stats is not None:
+        stats.update(timings, entries=cipher.size, largest_partition=largest, candidates=len(candidates),
+                     workers=workers)
+    return keys
+
+class _Inline:
+    '''A stand-in for the process pool that runs every task at once, in this process.'''
+    class _Done:
+        def __init__(self, value):
+            self.value = value
+
+        def result(self):
+            return self.value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, task, *arguments):
+        return self._Done(task(*arguments))
+
+
+if __name__ == '__main__':
+    import random
+
+    spn_bits = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    des_bits = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    for cipher, n_pairs in ((DoubleSPN(key_bits=spn_bits), 5), (DoubleDES(key_bits=des_bits), 2)):
+        k1, k2 = cipher.key(random.randrange(cipher.size)), cipher.key(random.randrange(cipher.size))
+        pairs = []
+        for _ in range(n_pairs):
+            m = random.getrandbits(cipher.block_bits)
+            pairs.append((m, cipher.encrypt(k2, cipher.encrypt(k1, m))))
+        stats = {}
+        keys = attack(cipher, pairs, stats=stats)
+        assert (k1, k2) in keys
+        print(f"Double {type(cipher).__name__[6:]} with {cipher.key_bits}-bit keys ({stats['workers']} worker(s)): "
+              f"found {[(hex(a), hex(b)) for a, b in keys]}")
+        print(f"  forward {stats['forward']:.2f} s ({cipher.size / stats['forward']:,.0f} keys/s), "
+              f"sort {stats['sort']:.2f} s, backward {stats['backward']:.2f} s, "
+              f"{stats['candidates']} candidate(s) verified in {stats['verify']:.3f} s")
+
+    # With one or two known pairs, the SPN middle values fill only 16 or 32 bits: the sort must
+    # still split the table into partitions of about sort_chunk entries (up to a few times more,
+    # as the middle values of a small keyspace are not uniform).
+    sort_chunk = 1 << 10
+    cipher = DoubleSPN(key_bits=16)
+    for n_pairs in (1, 2):
+        k1, k2 = random.randrange(cipher.size), random.randrange(cipher.size)
+        pairs = [(m, cipher.encrypt(k2, cipher.encrypt(k1, m))) for m in random.sample(range(1 << 16), n_pairs)]
+        stats = {}
+        keys = attack(cipher, pairs, stats=stats, sort_chunk=sort_chunk)
+        assert (k1, k2) in keys and stats['largest_partition'] <= 4 * sort_chunk, stats
+        print(f"Double SPN, 16-bit keys, {n_pairs} pair(s), sort_chunk = {sort_chunk}: {len(keys)} key pair(s) "
+              f"found, largest partition {stats['largest_partition']} of {cipher.size} entries")
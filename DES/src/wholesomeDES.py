@@ -440,29 +440,31 @@ class DES:
 
         return rounds
 
-############### TESTING ##############
-############## FIRST WITH NUMBERS ############
-number = 1312  # DO NOT SEARCH THAT NUMBER
-binary = int_to_bin(number, block_size=64)
-
-des = DES(key=78)
-ciphertext = des.encrypt(binary)
-print('Plaintext:', binary)
-print('Ciphertext:', ciphertext)
-
-# Decrypting
-decrypted = des.decrypt(ciphertext)
-print('Decrypted:', decrypted)
-print('Value:', int(decrypted, base=2))
-assert number == int(decrypted, base=2) # CHECK IF DECRYPTION IS CORRECT FOR NUMBERS
-
-############## TEXT MESSAGE EXAMPLE ############# 
-message = 'We just made a wholesome DES example from scratch without any libraries!Could you imagine?'
-ciphertext = des.encrypt_message(message)
-print('Ciphertext:', ciphertext)
-
-# Decryption
-decrypted = des.decrypt_message(ciphertext)
-print('Decrypted:', decrypted)
-
-assert decrypted == message # CHECK IF DECRYPTION IS CORRECT 
\ No newline at end of file
+
+if __name__ == '__main__':
+    ############### TESTING ##############
+    ############## FIRST WITH NUMBERS ############
+    number = 1312  # DO NOT SEARCH THAT NUMBER
+    binary = int_to_bin(number, block_size=64)
+
+    des = DES(key=78)
+    ciphertext = des.encrypt(binary)
+    print('Plaintext:', binary)
+    print('Ciphertext:', ciphertext)
+
+    # Decrypting
+    decrypted = des.decrypt(ciphertext)
+    print('Decrypted:', decrypted)
+    print('Value:', int(decrypted, base=2))
+    assert number == int(decrypted, base=2) # CHECK IF DECRYPTION IS CORRECT FOR NUMBERS
+
+    ############## TEXT MESSAGE EXAMPLE ############# 
+    message = 'We just made a wholesome DES example from scratch without any libraries!Could you imagine?'
+    ciphertext = des.encrypt_message(message)
+    print('Ciphertext:', ciphertext)
+
+    # Decryption
+    decrypted = des.decrypt_message(ciphertext)
+    print('Decrypted:', decrypted)
+
+    assert decrypted == message # CHECK IF DECRYPTION IS CORRECT 
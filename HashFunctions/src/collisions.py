@@ -0,0 +1,146 @@
+'''
+Collisions of truncated hash functions, in memory that does not grow with the work.
+
+    truncated_hash(name, nbytes)      -> H(x) = the first nbytes of hashlib's name(x)
+    find_collision(name, nbytes)      -> (x, y) with x != y and H(x) = H(y)
+
+The dictionary search of HashFunctions.md stores every hash it computes: for a 2-byte hash that is
+a few hundred entries, but a 6-byte hash needs about 2^24 of them.  Here the search walks instead
+(Pollard's rho, parallelized as by van Oorschot and Wiener):
+
+1. A trail starts at a random nbytes string x_0 and follows x_(i+1) = H(x_i).  The outputs of H
+   are themselves nbytes strings, so the walk stays in one space of 2^(8 nbytes) points.
+2. A point is distinguished if its leading dp_bits bits are zero.  A trail stops at the first
+   distinguished point, and only (start, distinguished point, length) is stored.
+3. Once two trails meet they coincide up to the same distinguished point.  So a second trail
+   ending at a known distinguished point means a collision: walk the longer trail ahead by the
+   difference in length, then step both together until the next points are equal.
+
+The expected work is still about sqrt(pi/2 * 2^(8 nbytes)) hashes, but the memory is one entry per
+trail, 2^dp_bits times fewer than the hashes.  Trails are walked by a pool of processes that never
+share anything: the distinguished points come back to the parent, which looks for the meeting.
+
+Usage:
+    python collisions.py [hash name] [bytes] [workers]
+'''
+
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+TASK_HASHES = 1 << 20  # Hashes per task handed to a worker, roughly.
+
+def truncated_hash(name, nbytes):
+    '''H(x) = the first nbytes bytes of the hashlib digest name (md5, sha1, sha256, shake_128, ...).'''
+    new = getattr(hashlib, name, None) or (lambda x: hashlib.new(name, x))
+    if name.startswith('shake'):
+        return lambda x: new(x).digest(nbytes)
+    return lambda x: new(x).digest()[:nbytes]
+
+def _default_dp_bits(nbytes):
+    # About 2^8 trails before the expected collision; fewer waste the last trails of every worker,
+    # more only cost memory.
+    return max(0, 4*nbytes - 8)
+
+def _trails(name, nbytes, dp_bits, count):
+    '''Walk count trails from random starts.  Returns ([(start, end, length), ...], hashes walked).'''
+    H = truncated_hash(name, nbytes)
+    limit = (1 << (8*nbytes - dp_bits)).to_bytes(nbytes, 'big') if dp_bits else None
+    max_length = 20 << dp_bits  # Longer trails are almost surely stuck in a cycle without a distinguished point.
+    trails, hashes = [], 0
+    for _ in range(count):
+        start = x = os.urandom(nbytes)
+        for length in range(1, max_length + 1):
+            x = H(x)
+            # Equal-length byte strings compare like the big-endian integers they encode.
+            if limit is None or x < limit:
+                trails.append((start, x, length))
+                break
+        hashes += length
+    return trails, hashes
+
+def _locate(H, a, la, b, lb):
+    '''The colliding pair of two trails that end at the same point, or None if one contains the other's start.'''
+    if la < lb:
+        a, la, b, lb = b, lb, a, la
+    for _ in range(la - lb):
+        a = H(a)
+    if a == b:
+        return None
+    while True:
+        next_a, next_b = H(a), H(b)
+        if next_a == next_b:
+            return a, b
+        a, b = next_a, next_b
+
+def find_collision(name='md5', nbytes=6, dp_bits=None, max_workers=None, time_budget=None, stats=None):
+    '''
+    Two different nbytes strings x, y with truncated_hash(name, nbytes)(x) == ...(y), as (x, y).
+    Trails are walked in max_workers processes (by default one per core).  Returns None if
+    time_budget seconds pass first.  If stats is a dictionary, it is filled with the hashes
+    computed, the seconds spent, the trails stored and the hashes per second per worker.
+    '''
+    H = truncated_hash(name, nbytes)
+    dp_bits = _default_dp_bits(nbytes) if dp_bits is None else dp_bits
+    if not 0 <= dp_bits < 8*nbytes:
+        raise ValueError(f"dp_bits must be in [0, {8*nbytes}), got {dp_bits}")
+    # A task is TASK_HASHES hashes, or a sixteenth of the expected work for small hashes.
+    count = max(1, min(TASK_HASHES, 1 << max(0, 4*nbytes - 4)) >> dp_bits)
+    workers = max_workers or os.cpu_count() or 1
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+
+    table = {}  # Distinguished point -> (start, length) of the first trail that reached it.
+    hashes, start_time, found = 0, time.perf_counter(), None
+
+    def absorb(trails):
+        for start, end, length in trails:
+            if end not in table:
+                table[end] = (start, length)
+                continue
+            other, other_length = table[end]
+            if other != start:
+                pair = _locate(H, start, length, other, other_length)
+                if pair:
+                    return pair
+        return None
+
+    if workers == 1:
+        while found is None and (deadline is None or time.monotonic() < deadline):
+            trails, walked = _trails(name, nbytes, dp_bits, count)
+            hashes += walked
+            found = absorb(trails)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(_trails, name, nbytes, dp_bits, count) for _ in range(2*workers)}
+            while found is None and (deadline is None or time.monotonic() < deadline):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    trails, walked = future.result()
+                    hashes += walked
+                    found = found or absorb(trails)
+                    if found is None:
+                        pending.add(pool.submit(_trails, name, nbytes, dp_bits, count))
+            pool.shutdown(cancel_futures=True)
+
+    if stats is not None:
+        seconds = time.perf_counter() - start_time
+        stats.update(hashes=hashes, seconds=seconds, trails=len(table), workers=workers,
+                     per_worker=hashes / seconds / workers if seconds else 0.0)
+    return found
+
+
+if __name__ == '__main__':
+    name = sys.argv[1] if len(sys.argv) > 1 else 'md5'
+    nbytes = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    stats = {}
+    x, y = find_collision(name, nbytes, max_workers=workers, stats=stats)
+    H = truncated_hash(name, nbytes)
+    assert x != y and H(x) == H(y)
+    print(f"Collision of {name} truncated to {8*nbytes} bits:")
+    print(f"  H({x.hex()}) = H({y.hex()}) = {H(x).hex()}")
+    print(f"  {stats['hashes']:,} hashes in {stats['seconds']:.1f} s on {stats['workers']} worker(s), "
+          f"{stats['per_worker']:,.0f} hashes/s per worker; {stats['trails']} distinguished points stored")
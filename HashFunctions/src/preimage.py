@@ -0,0 +1,283 @@
+'''
+Preimages and second preimages of weak hash functions by search.
+
+    search(H, target, space)          -> the x in space with H(x) == target, in processes, resumable
+    bytewise_preimage(H, target)      -> a preimage under a byte-wise H, found for all bytes at once
+    bytewise_count(H, target)         -> the number of those preimages
+
+A search space is anything with a length and slicing, such as range(lo, hi) for hashes of integers,
+or Strings(alphabet, length) for every string of a given length over an alphabet.  search() splits
+the space into chunks of consecutive indices, hands them to a process pool in order, and, given a
+checkpoint path, records how far it got every few seconds; the same call picks up from there.
+A second preimage of x is search(H, H(x), space, avoid=x).
+
+A hash is byte-wise if it applies one map f to every byte, like the AND-with-0xAD and Caesar
+hashes of HashFunctions.md.  Then a search over 256^n messages is n independent searches over 256
+bytes, and they are all the same search: H(bytes(range(256))) reads off f, inverting f gives the
+smallest preimage of every output byte, and a NumPy lookup of the whole target in that inverse
+table gives the preimage of a message of any length at once.
+
+H must be a module-level function (the worker processes get it by pickling).  The toy hashes of
+HashFunctions.md are defined below for the labs.
+
+Usage:
+    python preimage.py
+'''
+
+import ast
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import prod
+
+CHUNK = 1 << 16  # Candidates per task.
+TAIL_BLOCK = 1 << 12  # Strings precomputes the endings of about this many consecutive strings.
+CHECKPOINT_SECONDS = 5  # Time between checkpoint writes.
+
+############################  Toy hashes from HashFunctions.md
+
+def linear_hash(x, a=11, b=-977):
+    return a*x + b
+
+def ascii_sum(x):
+    return sum(x)
+
+def and_hash(x):
+    return bytes([b & 0xad for b in x])
+
+def caesar_hash(x, key=17):
+    '''The Caesar cipher with shift key on lowercase letters; other bytes pass unchanged.'''
+    return bytes([(b - 97 + key) % 26 + 97 if 97 <= b <= 122 else b for b in x])
+
+def md5_16(x):
+    return hashlib.md5(x).digest()[:2]
+
+def md5_24(x):
+    return hashlib.md5(x).digest()[:3]
+
+############################  Search spaces
+
+class Strings:
+    '''
+    Every bytes string of the given length over alphabet, in lexicographic order; Strings(b'ab', 2)
+    is b'aa', b'ab', b'ba', b'bb'.  Indexing and slicing take integer positions, as for a range.
+    '''
+    def __init__(self, alphabet, length):
+        self.alphabet = bytes(alphabet)
+        self.length = length
+        self.size = len(self.alphabet) ** length
+        self._k = 0  # The last _k bytes of consecutive strings come from the precomputed _tails.
+        while self._k < length and len(self.alphabet) ** (self._k + 1) <= TAIL_BLOCK:
+            self._k += 1
+        self._tails = None
+
+    def __repr__(self):
+        return f"Strings({self.alphabet!r}, {self.length})"
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if key != '_tails'}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _tails=None)
+
+    def _digits(self, index, n):
+        base = len(self.alphabet)
+        out = bytearray(n)
+        for i in range(n - 1, -1, -1):
+            index, d = divmod(index, base)
+            out[i] = self.alphabet[d]
+        return bytes(out)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._iterate(*index.indices(self.size)[:2])
+        if not 0 <= index < self.size:
+            raise IndexError("Strings index out of range")
+        return self._digits(index, self.length)
+
+    def _iterate(self, start, stop):
+        if self._tails is None:
+            self._tails = [bytes(t) for t in product(self.alphabet, repeat=self._k)]
+        block = len(self._tails)
+        for p in range(start // block, (stop - 1) // block + 1):
+            prefix = self._digits(p, self.length - self._k)
+            for tail in self._tails[max(start - p*block, 0):min(stop - p*block, block)]:
+                yield prefix + tail
+
+############################  Exhaustive search
+
+def _search_chunk(H, target, space, start, stop, avoid, limit):
+    '''The hits [(index, x), ...] in space[start:stop], and the index where the search stopped.'''
+    hits = []
+    for i, x in enumerate(space[start:stop], start):
+        if H(x) == target and x != avoid:
+            hits.append((i, x))
+            if len(hits) == limit:
+                return hits, i + 1
+    return hits, stop
+
+def _load(checkpoint, target, size):
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return 0, []
+    with open(checkpoint) as f:
+        state = json.load(f)
+    if state['target'] != repr(target) or state['size'] != size:
+        raise ValueError(f"{checkpoint} is the checkpoint of another search")
+    return state['next'], [ast.literal_eval(x) for x in state['found']]
+
+def _save(checkpoint, target, size, next_index, found):
+    tmp = f"{checkpoint}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'target': repr(target), 'size': size, 'next': next_index,
+                   'found': [repr(x) for x in found]}, f)
+    os.replace(tmp, checkpoint)
+
+def search(H, target, space, avoid=None, limit=1, max_workers=None, checkpoint=None, time_budget=None):
+    '''
+    The candidates x in space (in order) with H(x) == target and x != avoid, as a list: the first
+    limit of them, or all of them if limit is None.
+    Chunks of CHUNK candidates go to max_workers processes (by default one per core).  With a
+    checkpoint path, the progress is saved there and a later call with the same arguments resumes
+    it; if time_budget seconds pass first, the search stops and returns what it has found so far.
+    '''
+    size = getattr(space, 'size', None) or len(space)  # len() overflows beyond 2^63.
+    next_index, found = _load(checkpoint, target, size)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    last_save = time.monotonic()
+
+    def done():
+        return next_index >= size or (limit is not None and len(found) >= limit) or \
+            (deadline is not None and time.monotonic() >= deadline)
+
+    def absorb(result):
+        nonlocal next_index, last_save
+        hits, next_index = result
+        for i, x in hits:
+            if limit is not None and len(found) == limit:
+                next_index = i  # A hit beyond the limit is found again on resuming.
+                break
+            found.append(x)
+        if checkpoint is not None and (done() or time.monotonic() - last_save >= CHECKPOINT_SECONDS):
+            _save(checkpoint, target, size, next_index, found)
+            last_save = time.monotonic()
+
+    chunks = ((start, min(start + CHUNK, size)) for start in range(next_index, size, CHUNK))
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        for start, stop in chunks:
+            if done():
+                break
+            absorb(_search_chunk(H, target, space, start, stop, avoid, limit))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for start, stop in chunks:
+                if done():
+                    break
+                pending.append(pool.submit(_search_chunk, H, target, space, start, stop, avoid, limit))
+                if len(pending) >= 2*workers:
+                    absorb(pending.popleft().result())
+            while pending and not done():
+                absorb(pending.popleft().result())
+            for future in pending:
+                future.cancel()
+    if checkpoint is not None:
+        _save(checkpoint, target, size, next_index, found)
+    return found
+
+############################  Byte-wise hashes
+
+def byte_map(H):
+    '''
+    The byte map f of a byte-wise hash H(x) = f(x[0]) f(x[1]) ..., as a NumPy array of 256 bytes,
+    read off H(bytes(range(256))).  Raises ValueError if H is not of that form.
+    '''
+    import numpy as np
+    f = np.frombuffer(H(bytes(range(256))), dtype=np.uint8)
+    if len(f) != 256 or H(bytes(range(255, -1, -1))) != f[::-1].tobytes():
+        raise ValueError("the hash does not apply one map to each byte")
+    return f
+
+def bytewise_count(H, target):
+    '''The number of preimages of target under the byte-wise hash H.'''
+    import numpy as np
+    per_value = np.bincount(byte_map(H), minlength=256)  # Preimage bytes of each output byte.
+    return prod(per_value[np.frombuffer(bytes(target), dtype=np.uint8)].tolist())
+
+def bytewise_preimage(H, target, avoid=None):
+    '''
+    A preimage of target under the byte-wise hash H, other than avoid if given, or None.
+    Each byte is the smallest preimage of its target byte, found by one table lookup for all of them.
+    '''
+    import numpy as np
+    f = byte_map(H)
+    # The smallest and second smallest preimage bytes of every output byte (256 where there is none).
+    values = np.arange(256, dtype=np.int16)
+    first, second = np.full(256, 256, dtype=np.int16), np.full(256, 256, dtype=np.int16)
+    np.minimum.at(first, f, values)
+    rest = values != first[f]
+    np.minimum.at(second, f[rest], values[rest])
+    first[first == 256], second[second == 256] = -1, -1
+    t = np.frombuffer(bytes(target), dtype=np.uint8)
+    choice = first[t]
+    if (choice < 0).any():
+        return None
+    if avoid is not None and choice.astype(np.uint8).tobytes() == avoid:
+        alternatives = np.flatnonzero(second[t] >= 0)
+        if not len(alternatives):
+            return None
+        choice[alternatives[0]] = second[t[alternatives[0]]]
+    return choice.astype(np.uint8).tobytes()
+
+
+if __name__ == '__main__':
+    import string
+    import tempfile
+
+    # The AND hash: a second preimage of 'f1nd_m3', then of a megabyte, byte by byte at once.
+    x = b'f1nd_m3'
+    y = bytewise_preimage(and_hash, and_hash(x), avoid=x)
+    print(f"and_hash({x}) = and_hash({y}) = {and_hash(y)}; "
+          f"{bytewise_count(and_hash, and_hash(x))} preimages in all")
+    x = os.urandom(1 << 20)
+    start = time.perf_counter()
+    y = bytewise_preimage(and_hash, and_hash(x), avoid=x)
+    t_vector = time.perf_counter() - start
+    start = time.perf_counter()
+    loop = bytes(next(b for b in range(256) if b & 0xad == hb) for hb in and_hash(x))
+    t_loop = time.perf_counter() - start
+    assert y != x and and_hash(y) == and_hash(x) == and_hash(loop)
+    print(f"Second preimage of a 1 MB message: {t_vector:.2f} s vectorized, {t_loop:.2f} s byte by byte")
+
+    # Caesar: the preimage of a word.
+    print("caesar_hash preimage of b'cfnvi':", bytewise_preimage(caesar_hash, b'cfnvi'))
+
+    # The linear hash over the integers, and the ASCII sum over lowercase strings.
+    print("linear_hash preimage of 13730:", search(linear_hash, 13730, range(-10**6, 10**6)))
+    lowercase = string.ascii_lowercase.encode()
+    print("ascii_sum second preimages of b'crypto':",
+          search(ascii_sum, ascii_sum(b'crypto'), Strings(lowercase, 6), avoid=b'crypto', limit=5))
+
+    # Truncated MD5: interrupted after two seconds, then resumed from the checkpoint.
+    target = md5_24(b'secret')
+    space = Strings(lowercase, 6)
+    checkpoint = os.path.join(tempfile.mkdtemp(), 'md5_24.json')
+    start = time.perf_counter()
+    found = search(md5_24, target, space, checkpoint=checkpoint, time_budget=2)
+    with open(checkpoint) as f:
+        searched = json.load(f)['next']
+    print(f"md5_24 preimage search: {searched:,} candidates in {time.perf_counter() - start:.1f} s, "
+          f"stopped with {found}")
+    found = search(md5_24, target, space, checkpoint=checkpoint)
+    with open(checkpoint) as f:
+        searched = json.load(f)['next']
+    print(f"Resumed: found {found} after {searched:,} candidates in all "
+          f"({time.perf_counter() - start:.1f} s)")
+    assert md5_24(found[0]) == target
@@ -1,30 +1,24 @@
 def jacobi_symbol(a, n):
-    if a ==0:
-        return 0
-    if a ==1:
-        return 1
-    #write a = 2^e *s where a1 is odd
-    e =0
-    a1 = a
-    while a1 & 1==0: #while a1 is even
-        a1>>=1
-        e+=1
-        
-    #if e is even set s = 1
-    if e & 1 == 0:
-        s = 1
-    elif n % 8 == 7 or n % 8 == 1:
-        s = 1
-    elif n % 8 == 3 or n % 8 == 5:
-        s = -1
-    
-    if n % 4 == 3 and a1 % 4 == 3:
-        s = -s
-        
-    n1 = n % a1
-    if a1 ==1:
-        return s
-    else:
-        return s * jacobi_symbol(n1, a1)
+    '''
+    The Jacobi symbol (a|n), for any integer a and odd n > 0, without recursion.
+    Each round strips every factor of two from a at once and then applies quadratic reciprocity.
+    This is a copy of jacobi_symbol in Primes/src/jacobi.py (with the Legendre and Kronecker symbols
+    and a batch version there); keep the two in sync.
+    '''
+    if n <= 0 or not n & 1:
+        raise ValueError(f"the Jacobi symbol needs an odd positive n, got {n}")
+    a %= n
+    result = 1
+    while a:
+        tz = (a & -a).bit_length() - 1  # a = 2^tz * (odd)
+        a >>= tz
+        if tz & 1 and n & 7 in (3, 5):  # (2|n) = -1 exactly when n = 3, 5 (mod 8).
+            result = -result
+        if a & n & 2:  # Both are 3 (mod 4): quadratic reciprocity flips the sign.
+            result = -result
+        a, n = n % a, a
+    return result if n == 1 else 0
 
-print(jacobi_symbol(158, 235))
+
+if __name__ == '__main__':
+    print(jacobi_symbol(158, 235))
@@ -1,4 +1,5 @@
-from math import sqrt
+from math import sqrt, isqrt
+from itertools import compress
 import timeit
 
 def isprime_list(n):
@@ -25,13 +26,6 @@ def where(L):
     '''
     return [n for n in range(len(L)) if L[n]]
 
-#print(where(isprime_list(100)))
-
-#print(sum(isprime_list(1000000)))  # The number of primes up to a million!
-
-t1 = timeit.timeit('sum(isprime_list(1000000))', globals=globals(), number=1)
-print(t1)
-
 
 def isprime_list_fast(n):
     ''' 
@@ -50,9 +44,6 @@ def isprime_list_fast(n):
         
     return flags
 
-t2 = timeit.timeit('sum(isprime_list_fast(1000000))', globals=globals(), number=1)
-print(t2)
-
 def isprime_list_fastest(n):
     ''' 
     Return a list of length n+1
@@ -71,5 +62,89 @@ def isprime_list_fastest(n):
     return flags
 
 
-t3 = timeit.timeit('sum(isprime_list_fastest(1000000))', globals=globals(), number=1)
-print(t3)
\ No newline at end of file
+# The sieves above hold a Python list of n+1 booleans (8 bytes per entry) for the whole range,
+# which makes n = 10^9 impossible.  The segmented sieve below only stores odd numbers, one byte
+# each, and only for one cache-sized segment at a time, so its memory is O(sqrt(hi)) + one segment.
+
+SEGMENT_SIZE = 1 << 18  # Odd candidates per segment: 256 KiB, which fits comfortably in L2.
+
+def base_primes(n):
+    '''
+    Return the list of primes p <= n,
+    using an odd-only bytearray sieve (index i stands for 2i+1).
+    '''
+    if n < 2:
+        return []
+    flags = bytearray([1]) * ((n+1)//2)
+    flags[0] = 0  # 1 is not prime.
+    for i in range(1, (isqrt(n)+1)//2):
+        if flags[i]:
+            p = 2*i + 1
+            start = p*p//2
+            flags[start::p] = bytes(len(range(start, len(flags), p)))  # Multiples p*p, p*p+2p, ...
+    return [2] + list(compress(range(1, n+1, 2), flags))
+
+def odd_segments(lo, hi, primes=None, segment_size=SEGMENT_SIZE):
+    '''
+    Sieve the odd numbers of [lo, hi) one segment at a time.
+    Yields (start, flags) where flags[i] == 1 iff start + 2i is an odd prime.
+    primes should contain the odd primes up to sqrt(hi); they are computed if omitted.
+    '''
+    if primes is None:
+        primes = base_primes(isqrt(max(hi-1, 0)))[1:]
+    start = max(lo, 3) | 1  # The first odd number >= lo (1 is not prime, 2 is handled by the callers).
+    while start < hi:
+        end = min(start + 2*segment_size, hi)
+        size = (end - start + 1)//2
+        flags = bytearray([1]) * size
+        for p in primes:
+            pp = p*p
+            if pp >= end:
+                break
+            m = max(pp, (start + p - 1)//p*p)  # The first multiple of p in the segment, at least p*p.
+            if not m & 1:
+                m += p  # Even multiples were never stored.
+            i = (m - start)//2
+            if i < size:
+                flags[i::p] = bytes((size - 1 - i)//p + 1)
+        yield start, flags
+        start += 2*size
+
+def segmented_primes(lo, hi, segment_size=SEGMENT_SIZE):
+    '''
+    Generate the primes in [lo, hi) in increasing order.
+    '''
+    if lo <= 2 < hi:
+        yield 2
+    for start, flags in odd_segments(lo, hi, segment_size=segment_size):
+        yield from compress(range(start, start + 2*len(flags), 2), flags)
+
+def segmented_prime_count(lo, hi, segment_size=SEGMENT_SIZE):
+    '''
+    Return the number of primes in [lo, hi).
+    '''
+    count = 1 if lo <= 2 < hi else 0
+    for _, flags in odd_segments(lo, hi, segment_size=segment_size):
+        count += flags.count(1)
+    return count
+
+
+if __name__ == '__main__':
+    #print(where(isprime_list(100)))
+
+    #print(sum(isprime_list(1000000)))  # The number of primes up to a million!
+
+    t1 = timeit.timeit('sum(isprime_list(1000000))', globals=globals(), number=1)
+    print(t1)
+
+    t2 = timeit.timeit('sum(isprime_list_fast(1000000))', globals=globals(), number=1)
+    print(t2)
+
+    t3 = timeit.timeit('sum(isprime_list_fastest(1000000))', globals=globals(), number=1)
+    print(t3)
+
+    t4 = timeit.timeit('segmented_prime_count(0, 1000001)', globals=globals(), number=1)
+    print(t4)
+
+    t5 = timeit.timeit('print(segmented_prime_count(0, 10**9))', globals=globals(), number=1)
+    print(t5)  # 50847534 primes below a billion, with about a megabyte of memory.
@@ -20,6 +20,9 @@ INPUT: int p, int k, a_n, a_(n-1), ... , a_0
 
 from sys import argv
 
+from egcd import solve_lde
+from polyroots import roots_mod_p
+
 class Polynomial(list):
     """A polynomial whose coeffients, from highest power to lowest, are given by list."""
     def __init__(self, clist):
@@ -52,62 +55,60 @@ def FormalDerivative(f):
         dc.coeffs.append((l-i-1)*f.coeffs[i])
     return dc
 
-def Evaluate(f, x):
-    """Evaluate f(x)"""
+def Evaluate(f, x, m=None):
+    """Evaluate f(x) with Horner's rule, reducing mod m at every step if m is given."""
     r=0
-    n=len(f.coeffs)-1
-    for i in range(n+1):
-        r += f.coeffs[i]*(x**(n-i))
+    for a in f.coeffs:
+        r = r*x + a
+        if m is not None:
+            r %= m
     return r
 
 def ExtendedEuclideanAlgorithm(a,b,c):
-    """Returns the least x, y such that ax + by = c."""
-    revflag=False
-    if b>a:
-        a,b=b,a
-        revflag=True
-    r , q = [a,b,a%b] , int(a/b)
-    s , t = [1,0,1] , [0,1,-q]
-    if r[2]==0:
-        if c%b == 0:
-            if revflag == False: return 0,c/b
-            return c/b, 0
-        return False
-    while r[2]>0:
-        q=int(r[1]/r[2])
-        r[0], r[1], r[2] = r[1], r[2], r[1]%r[2]
-        s[0], s[1], s[2] = s[1], s[2], s[1]-s[2]*q
-        t[0], t[1], t[2] = t[1], t[2], t[1]-t[2]*q
-    if c%r[1] != 0:
+    """Returns integers x, y such that ax + by = c, or False if there are none."""
+    solution = solve_lde(a, b, c)
+    if solution is None or (a == 0 and b == 0):
         return False
-    d=c/r[1]
-    if revflag: 
-        s,t = t,s
-    return d*s[1],d*t[1]
+    return solution[:2]
+
+def _newton_lift(f, df, r, p, k):
+    """
+    Lift the simple root r of f mod p (f'(r) != 0 mod p) to the unique root mod p^k that is r mod p.
+    Each step doubles the precision: r -> r - f(r)/f'(r) takes a root mod p^e to one mod p^2e,
+    and the inverse of f'(r) is carried along with the same Newton step, u -> u(2 - f'(r)u).
+    """
+    e, m = 1, p
+    u = pow(Evaluate(df, r, p), -1, p)  # 1/f'(r) mod p^e
+    while e < k:
+        e = min(2*e, k)
+        m = p**e
+        r = (r - Evaluate(f, r, m)*u) % m
+        u = u*(2 - Evaluate(df, r, m)*u) % m
+    return r
 
 def Hensel(f,p,k):
-    """Returns solutions to f(x) mod p^k = 0. """
+    """
+    Returns the solutions to f(x) mod p^k = 0, in increasing order.
+
+    The roots mod p come from polyroots.roots_mod_p (gcd with x^p - x, then Cantor-Zassenhaus),
+    so p can be large.  Roots mod p with f'(r) != 0 mod p lift to exactly one root each, found with Newton's method,
+    which doubles the power of p at every step.  Roots with f'(r) = 0 mod p are lifted one power
+    of p at a time, following cases II and III of the lemma.  All arithmetic is done mod p^k.
+    """
     if k < 1: return False
-    if k == 1:
-        r=[]
-        for i in range(p):
-            if Evaluate(f,i)%p == 0:
-                r.append(i)
-        return r
-    r = Hensel(f,p,k-1)
-    df=FormalDerivative(f)
-    rnew=[]
-    for i,n in enumerate(r):
-        dfr=Evaluate(df,n)
-        fr=Evaluate(f,n)
-        if dfr%p != 0:
-            t=(-(ExtendedEuclideanAlgorithm(dfr, p, 1)[0])*int(fr/p**(k-1)))%p
-            rnew.append(r[i]+t*p**(k-1))
-        if dfr%p == 0:
-            if fr % p**k == 0:
-                for t in range(0,p):
-                    rnew.append(r[i]+t*p**(k-1))                
-    return rnew
+    df = FormalDerivative(f)
+    base = roots_mod_p(f.coeffs, p)
+    roots = [_newton_lift(f, df, r, p, k) for r in base if Evaluate(df, r, p) != 0]
+
+    singular = [r for r in base if Evaluate(df, r, p) == 0]
+    m = p
+    for _ in range(1, k):
+        if not singular:
+            break
+        # Case II: every lift of r is a root mod pm.  Case III: none is.
+        singular = [r + t*m for r in singular if Evaluate(f, r, p*m) == 0 for t in range(p)]
+        m *= p
+    return sorted(roots + singular)
 
 if __name__ == '__main__':
     p = int(argv[1])
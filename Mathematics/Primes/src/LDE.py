@@ -1,55 +1,32 @@
-def hop_and_skip(a, b):
+from egcd import egcd, solve_lde
+
+def hop_and_skip(a, b, quiet=False):
     """
-    Computes the Bézout identity: gcd(a, b) = x * a + y * b
-    using a traceable version of the Euclidean algorithm.
+    Computes the Bézout identity: gcd(a, b) = x * a + y * b.
+    Returns (gcd, x, y); the identity is printed unless quiet.
     """
-    u, v = a, b
-    u_hops, u_skips = 1, 0
-    v_hops, v_skips = 0, 1
-
-    while v != 0:
-        q = u // v
-        r = u % v
-        r_hops = u_hops - q * v_hops
-        r_skips = u_skips - q * v_skips
-
-        u, v = v, r
-        u_hops, v_hops = v_hops, r_hops
-        u_skips, v_skips = v_skips, r_skips
-
-    print(f"{u} = {u_hops}*{a} + {u_skips}*{b}")
+    g, x, y = egcd(a, b)
+    if not quiet:
+        print(f"{g} = {x}*{a} + {y}*{b}")
+    return g, x, y
 
-def solve_LDE(a, b, c):
+def solve_LDE(a, b, c, quiet=False):
     """
     Solves the equation ax + by = c for integer x, y.
     Returns one solution (x, y) if it exists, otherwise None.
+    The general solution is printed unless quiet.
     """
-    u, v = a, b
-    u_hops, u_skips = 1, 0
-    v_hops, v_skips = 0, 1
-
-    while v != 0:
-        q = u // v
-        r = u % v
-        r_hops = u_hops - q * v_hops
-        r_skips = u_skips - q * v_skips
-
-        u, v = v, r
-        u_hops, v_hops = v_hops, r_hops
-        u_skips, v_skips = v_skips, r_skips
-
-    g = u  # gcd(a, b)
-
-    if c % g == 0:
-        d = c // g
-        x = d * u_hops
-        y = d * u_skips
+    solution = solve_lde(a, b, c)
+    if solution is None:
+        if not quiet:
+            print(f"No solutions exist for {a}x + {b}y = {c} because gcd({a}, {b}) = {egcd(a, b)[0]} does not divide {c}.")
+        return None
+    x, y, step_x, step_y = solution
+    if not quiet:
         print(f"{a}x + {b}y = {c} has solutions if and only if:")
-        print(f"x = {x} + {b // g}n, y = {y} - {a // g}n for n in ℤ.")
-        return x, y
-    else:
-        print(f"No solutions exist for {a}x + {b}y = {c} because gcd({a}, {b}) = {g} does not divide {c}.")
-    return None
+        print(f"x = {x} + {step_x}n, y = {y} - {step_y}n for n in ℤ.")
+    return x, y
 
 
-print(solve_LDE(1337, 137, 1))
\ No newline at end of file
+if __name__ == '__main__':
+    print(solve_LDE(1337, 137, 1))
@@ -1,24 +1,69 @@
-from sympy import nextprime, legendre_symbol, isprime, mod_inverse
-from sympy.ntheory.modular import crt
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from random import randint, choice
 from math import prod as product
 
-def generate_S_a(a_list, p_bound):
-    """Generate S[a] = { p mod 4a : p prime < p_bound, (a|p) = -1 }."""
-    S = {a: set() for a in a_list}
+from crt import solve_congruences
+from jacobi import jacobi_symbol
+from primality import is_prime, is_prime_no_small_factor
+from primegen import sieve_primes, sieved_progression
+
+RESIDUE_CHUNK = 1 << 22  # Primes reduced at a time in generate_S_a.
+
+_S_cache = {}
+
+def _S_path(a, p_bound, cache_dir):
+    return os.path.join(cache_dir, 'arnault', f"S_{a}_below_{p_bound}.txt")
+
+def _residue_classes(primes, modulus):
+    """The residues mod modulus of at least one of the primes (a NumPy array)."""
+    import numpy as np
+    hit = np.zeros(modulus, dtype=bool)
+    for i in range(0, len(primes), RESIDUE_CHUNK):
+        hit[np.asarray(primes[i:i + RESIDUE_CHUNK], dtype=np.int64) % modulus] = True
+    return np.flatnonzero(hit)
+
+def generate_S_a(a_list, p_bound, cache_dir=None):
+    """
+    Generate S[a] = { p mod 4a : p prime < p_bound, (a|p) = -1 }.
+
+    By quadratic reciprocity, (a|p) only depends on p mod 4a: it is the Jacobi symbol (a|r)
+    of the residue r = p mod 4a.  So the primes below p_bound are sieved once (as a prime table),
+    reduced mod 4a to find which residue classes they fall in, and one Jacobi symbol is computed
+    per class rather than one Legendre symbol per prime.
+    Each S[a] is cached per (a, p_bound), in memory and on disk under cache_dir.
+    """
+    from primetable import CACHE_DIR, prime_table
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+
+    S = {}
     for a in a_list:
-        p = 3
-        while p < p_bound:
-            if legendre_symbol(a, p) == -1:
-                S[a].add(p % (4 * a))
-            p = nextprime(p)
+        key = (a, p_bound, cache_dir)
+        if key not in _S_cache:
+            path = _S_path(a, p_bound, cache_dir)
+            if os.path.exists(path):
+                with open(path) as f:
+                    _S_cache[key] = frozenset(int(r) for r in f.read().split())
+            else:
+                primes = prime_table(p_bound, cache_dir).primes
+                primes = primes[1:] if len(primes) and primes[0] == 2 else primes  # Only odd primes.
+                S_a = frozenset(int(r) for r in _residue_classes(primes, 4*a) if jacobi_symbol(a, int(r)) == -1)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    f.write(' '.join(map(str, sorted(S_a))))
+                os.replace(tmp, path)
+                _S_cache[key] = S_a
+        S[a] = set(_S_cache[key])
     return S
 
 def random_prime_below(bound, lbound=2):
     """Return a random prime in [lbound, bound]."""
     while True:
         p = randint(lbound, bound)
-        if isprime(p):
+        if is_prime(p):
             return p
 
 def get_k(h, a_list, prime_bound):
@@ -38,7 +83,7 @@ def find_subsets_S(S, a_list, k_list):
     for a in a_list:
         temp = []
         for k in k_list:
-            invk = mod_inverse(k, 4*a)
+            invk = pow(k, -1, 4*a)
             transformed = {(invk * (s + k - 1)) % (4*a) for s in S[a]}
             temp.append(transformed)
         S_sub[a] = set.intersection(*temp)
@@ -57,45 +102,100 @@ def create_and_solve_conditions(a_list, zs, k_list):
     Returns (x, m) where m = ∏ moduli.
     """
     residues = [zs[a] for a in a_list] + [
-        mod_inverse(-k_list[1], k_list[2]),
-        mod_inverse(-k_list[2], k_list[1])
+        pow(-k_list[1], -1, k_list[2]),
+        pow(-k_list[2], -1, k_list[1])
     ]
     moduli   = [4*a for a in a_list] + [k_list[2], k_list[1]]
 
-    result = crt(moduli, residues)
+    # The moduli 4a share factors, so this goes through the general solver rather than a CRT context.
+    result = solve_congruences(residues, moduli)
     if result is None:
         raise ValueError("CRT failed: no solution for these congruences")
     x, _ = result
     m = product(moduli)
     return x, m
 
+SEARCH_BLOCK = 1 << 15  # Values of i per task in get_pseudoprime.
+
+def _search_block(x, m, k_list, i_start, count):
+    """
+    Sieve p1 = i*m + x for i in [i_start, i_start + count) so that no chain member k*(p1–1)+1
+    (k = 1 gives p1 itself) has a small factor, then primality-test the survivors.
+    Returns (product(chain), chain) for the first full chain, or None.
+    """
+    start = i_start*m + x
+    end = start + count*m
+    forms = [(k, 1 - k) for k in k_list]  # k*p1 + (1-k) = k*(p1–1) + 1
+    primes = (2,) + sieve_primes(start.bit_length())
+    for p1 in sieved_progression(start, m, forms=forms, primes=primes):
+        if p1 >= end:
+            break
+        chain = [k*(p1 - 1) + 1 for k in k_list]
+        if all(is_prime_no_small_factor(c) for c in chain):
+            return product(chain), chain
+    return None
+
 def get_pseudoprime(x, m, k_list,
                     starting_bitsize=128,
-                    max_attempts=1_000_000):
+                    max_attempts=1_000_000,
+                    max_workers=None):
     """
     Search for p1 = i*m + x of bit-length ≥ starting_bitsize
     such that p1 and each k*(p1–1)+1 are prime.
+
+    Instead of testing every i, each block of i values is first sieved: for every small prime s,
+    the i for which s divides some chain member form arithmetic progressions mod s, and are struck
+    out together.  Blocks are spread over max_workers processes (by default one per core) and
+    checked in order, so the result is the same chain as a sequential search would find.
     """
     bit_m = m.bit_length()
     i = 2**(starting_bitsize - bit_m) if starting_bitsize > bit_m else 1
-    p1 = i*m + x
-
-    for attempt in range(max_attempts):
-        if attempt % 50_000 == 0:
-            print(f"Attempt {attempt}: p1 bit-length = {p1.bit_length()}")
-        if isprime(p1):
-            chain = [p1]
-            for k in k_list[1:]:
-                c = k*(p1 - 1) + 1
-                if not isprime(c):
-                    break
-                chain.append(c)
-            else:
-                return product(chain), chain
-        p1 += m
+    blocks = [(x, m, k_list, i + j, min(SEARCH_BLOCK, max_attempts - j))
+              for j in range(0, max_attempts, SEARCH_BLOCK)]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        for block in blocks:
+            found = _search_block(*block)
+            if found:
+                return found
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            blocks = iter(blocks)
+            for block in blocks:
+                pending.append(pool.submit(_search_block, *block))
+                if len(pending) < 2*workers:
+                    continue
+                found = pending.popleft().result()
+                if found:
+                    for future in pending:
+                        future.cancel()
+                    return found
+            for future in pending:
+                found = future.result()
+                if found:
+                    return found
 
     raise RuntimeError("Exceeded max_attempts without finding a full pseudoprime chain")
 
+def find_conditions(S, a_list, h, k_bound):
+    """
+    Retry random k_list and z_a choices until the CRT system is solvable.
+    Returns (x, m, k_list).
+    """
+    while True:
+        k_list = get_k(h, a_list, k_bound)
+        S_sub   = find_subsets_S(S, a_list, k_list)
+        if any(len(s) == 0 for s in S_sub.values()):
+            continue
+        try:
+            zs = choose_z(S_sub, a_list)
+            x, m = create_and_solve_conditions(a_list, zs, k_list)
+            return x, m, k_list
+        except ValueError:
+            continue
+
 
 if __name__ == "__main__":
     # Parameters (tweak these for speed vs. difficulty)
@@ -103,33 +203,25 @@ if __name__ == "__main__":
     p_bound   = 1000
     k_bound   = 300
     h         = 3
-    bit_target= 64        # start small for testing
     max_tries = 2_000_000
 
     # 1) build S
     S = generate_S_a(a_list, p_bound)
 
-    # 2) find compatible k_list, S_sub, CRT solution
-    while True:
-        k_list = get_k(h, a_list, k_bound)
-        S_sub   = find_subsets_S(S, a_list, k_list)
-        if any(len(s) == 0 for s in S_sub.values()):
-            continue
-        try:
-            zs = choose_z(S_sub, a_list)
-            x, m = create_and_solve_conditions(a_list, zs, k_list)
-            break
-        except ValueError:
-            continue
+    for bit_target in (64, 128, 256):
+        start = time.perf_counter()
 
-    print("Found CRT solution; now searching for pseudoprime chain…")
+        # 2) find compatible k_list, S_sub, CRT solution
+        x, m, k_list = find_conditions(S, a_list, h, k_bound)
+        print(f"Found CRT solution; now searching for a {bit_target}-bit pseudoprime chain…")
 
-    # 3) search for the chain
-    p, chain = get_pseudoprime(
-        x, m, k_list,
-        starting_bitsize=bit_target,
-        max_attempts=max_tries
-    )
+        # 3) search for the chain
+        p, chain = get_pseudoprime(
+            x, m, k_list,
+            starting_bitsize=bit_target,
+            max_attempts=max_tries
+        )
 
-    print("Chain‐product pseudoprime:", p)
-    print("Prime chain factors:", chain)
+        print("Chain‐product pseudoprime:", p)
+        print("Prime chain factors:", chain)
+        print(f"Time to first result: {time.perf_counter() - start:.2f} s\n")
@@ -0,0 +1,120 @@
+'''
+Primality testing for many candidates at once.
+
+    batch_is_prime(candidates) -> NumPy boolean mask
+
+1. A vectorized residue sieve throws away every candidate with a prime factor below 1000.
+   The candidates are reduced once modulo a few 63-bit products of small primes, and the
+   divisibility by each small prime is then checked for all candidates at once in NumPy.
+2. Only the survivors (about 16% of random odd numbers) go through Miller-Rabin / Baillie-PSW,
+   spread over a pool of worker processes.
+
+Usage (benchmark):
+    python batchprimality.py [count] [bits]
+'''
+
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from primality import SMALL_PRIMES, TRIAL_BOUND, is_prime, is_prime_no_small_factor
+
+POOL_THRESHOLD = 512  # Below this many survivors, a process pool costs more than it saves.
+
+def _group_primes(primes, bound=2**63):
+    '''
+    Split primes into groups whose products stay below bound, so one residue per group fits in a uint64.
+    '''
+    groups, group, modulus = [], [], 1
+    for p in primes:
+        if modulus * p >= bound:
+            groups.append((modulus, np.array(group, dtype=np.uint64)))
+            group, modulus = [], 1
+        group.append(p)
+        modulus *= p
+    groups.append((modulus, np.array(group, dtype=np.uint64)))
+    return groups
+
+_GROUPS = _group_primes(SMALL_PRIMES)
+
+def small_factor_mask(candidates):
+    '''
+    Return a boolean mask, True where the candidate is divisible by a prime below TRIAL_BOUND.
+    candidates is a list of Python ints (of any size) or an integer NumPy array.
+    '''
+    mask = np.zeros(len(candidates), dtype=bool)
+    if isinstance(candidates, np.ndarray) and candidates.dtype.kind in 'ui':
+        values = candidates.astype(np.uint64)
+        for _, primes in _GROUPS:
+            mask |= (values[:, None] % primes[None, :] == 0).any(axis=1)
+        return mask
+    for modulus, primes in _GROUPS:
+        residues = np.fromiter((n % modulus for n in candidates), dtype=np.uint64, count=len(candidates))
+        mask |= (residues[:, None] % primes[None, :] == 0).any(axis=1)
+    return mask
+
+def _test_chunk(chunk):
+    return [is_prime_no_small_factor(n) for n in chunk]
+
+def batch_is_prime(candidates, max_workers=None):
+    '''
+    Return a NumPy boolean mask, True where the candidate is prime.
+    candidates is a list of Python ints or an integer NumPy array.
+    '''
+    candidates = [int(n) for n in candidates]
+    result = np.zeros(len(candidates), dtype=bool)
+    if not candidates:
+        return result
+
+    small = np.fromiter((n <= TRIAL_BOUND for n in candidates), dtype=bool, count=len(candidates))
+    for i in np.flatnonzero(small):
+        result[i] = is_prime(candidates[i])
+
+    survivors = np.flatnonzero(~small & ~small_factor_mask(candidates))
+    values = [candidates[i] for i in survivors]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(values) < POOL_THRESHOLD:
+        verdicts = _test_chunk(values)
+    else:
+        size = -(-len(values) // (4 * workers))  # About four chunks per worker, for load balancing.
+        chunks = [values[i:i + size] for i in range(0, len(values), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            verdicts = [v for chunk in pool.map(_test_chunk, chunks) for v in chunk]
+    result[survivors] = verdicts
+    return result
+
+
+if __name__ == '__main__':
+    from millerrabin import miller_rabin_test
+    from millerrabinfixed import miller_rabin_test_fixed
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    bits = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    candidates = [random.getrandbits(bits) | (1 << (bits - 1)) | 1 for _ in range(count)]
+
+    start = time.perf_counter()
+    mask = batch_is_prime(candidates)
+    t_batch = time.perf_counter() - start
+    print(f"batch_is_prime:               {t_batch:8.3f} s  ({mask.sum()} primes in {count} odd {bits}-bit numbers)")
+
+    start = time.perf_counter()
+    survivors = (~small_factor_mask(candidates)).sum()
+    print(f"  residue sieve alone:        {time.perf_counter() - start:8.3f} s  ({survivors} survivors)")
+
+    start = time.perf_counter()
+    loop = [is_prime(n) for n in candidates]
+    print(f"is_prime in a loop:           {time.perf_counter() - start:8.3f} s")
+
+    start = time.perf_counter()
+    loop = [miller_rabin_test_fixed(n, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)) == 'Probably prime' for n in candidates]
+    print(f"miller_rabin_test_fixed loop: {time.perf_counter() - start:8.3f} s")
+
+    start = time.perf_counter()
+    loop = [miller_rabin_test(n, 20) == 'Probably prime' for n in candidates]
+    t_loop = time.perf_counter() - start
+    print(f"miller_rabin_test loop:       {t_loop:8.3f} s  ({t_loop / t_batch:.0f}x slower than the batch)")
+    assert loop == mask.tolist()
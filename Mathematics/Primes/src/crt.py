@@ -0,0 +1,225 @@
+'''
+Chinese remaindering with everything that depends only on the moduli computed once.
+
+    ctx = CRT(moduli)                 pairwise coprime moduli, fixed
+    ctx.reconstruct(residues)         the x in [0, M) with x = r_i (mod m_i)
+    ctx.reconstruct_batch(rows)       the same for many residue vectors at once
+    ctx.reduce(x)                     the residues of x
+    ctx.multiply(a, b)                a * b through residue number system (RNS) arithmetic
+
+Garner's algorithm writes x in mixed radix, x = v_0 + v_1 m_0 + v_2 m_0 m_1 + ..., with
+v_i = (r_i - (v_0 + ... + v_(i-1) m_0 ... m_(i-2))) / (m_0 ... m_(i-1)) mod m_i.  The inverses
+c_i = 1/(m_0 ... m_(i-1)) mod m_i and the partial products mod m_i are the precomputation, so
+each digit only needs arithmetic mod one small m_i.  For a batch of residue vectors (moduli below
+2^31) the digits are computed for every vector at once with NumPy.
+
+For many moduli, a product tree (the products of pairs, pairs of pairs, ...) gives reduce a
+remainder tree and reconstruct a subquadratic combination, instead of working with M at every step.
+
+solve_congruences handles moduli that are not coprime, one congruence at a time.
+
+Usage (benchmark):
+    python crt.py
+'''
+
+import time
+from math import gcd, prod
+
+TREE_THRESHOLD = 16  # From this many moduli on, use the product tree instead of Garner's loop.
+
+def product_tree(values):
+    '''The levels of the product tree of values, from the leaves up to [prod(values)].'''
+    tree = [list(values)]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)])
+    return tree
+
+def remainder_tree(x, tree):
+    '''[x mod m for m in tree[0]], reducing down the product tree.'''
+    remainders = [x % tree[-1][0]]
+    for level in reversed(tree[:-1]):
+        remainders = [remainders[i // 2] % m for i, m in enumerate(level)]
+    return remainders
+
+def solve_congruences(residues, moduli):
+    '''
+    The solution (x, lcm of the moduli) of x = r_i (mod m_i), for any positive moduli,
+    or None if the congruences contradict each other.
+    '''
+    x, m = 0, 1
+    for r, n in zip(residues, moduli):
+        g = gcd(m, n)
+        if (r - x) % g:
+            return None
+        # x + m*t = r (mod n)  <=>  (m/g) t = (r - x)/g (mod n/g)
+        t = (r - x) // g * pow(m // g, -1, n // g) % (n // g)
+        x += m * t
+        m = m // g * n
+        x %= m
+    return x, m
+
+class CRT:
+    '''
+    Chinese remaindering for a fixed list of pairwise coprime moduli.
+    '''
+    def __init__(self, moduli):
+        self.moduli = tuple(moduli)
+        self.modulus = prod(self.moduli)
+        self.tree = product_tree(self.moduli)
+        if any(m < 1 for m in self.moduli) or self.tree[-1][0] != self._lcm():
+            raise ValueError("the moduli must be positive and pairwise coprime")
+
+        # Garner: partial[i][j] = m_0 ... m_(j-1) mod m_i, and garner[i] = 1/(m_0 ... m_(i-1)) mod m_i.
+        self.prefix = [1]
+        for m in self.moduli[:-1]:
+            self.prefix.append(self.prefix[-1] * m)
+        self.partial = [[P % m for P in self.prefix[:i]] for i, m in enumerate(self.moduli)]
+        self.garner = [pow(self.prefix[i] % m, -1, m) for i, m in enumerate(self.moduli)]
+        # Product tree: s_i = 1/(M/m_i) mod m_i.
+        self.cofactor_inverses = [pow(self.modulus // m % m, -1, m) for m in self.moduli]
+
+    def __repr__(self):
+        return f"CRT({list(self.moduli)})"
+
+    def _lcm(self):
+        m = 1
+        for n in self.moduli:
+            m = m // gcd(m, n) * n
+        return m
+
+    def digits(self, residues):
+        '''The mixed-radix digits v_0, v_1, ... of the solution (Garner's algorithm).'''
+        v = []
+        for i, (r, m) in enumerate(zip(residues, self.moduli)):
+            x = sum(d * P for d, P in zip(v, self.partial[i])) % m  # The solution so far, mod m.
+            v.append((r - x) * self.garner[i] % m)
+        return v
+
+    def reconstruct(self, residues):
+        '''The x in [0, M) with x = residues[i] (mod moduli[i]).'''
+        if len(self.moduli) < TREE_THRESHOLD:
+            x = 0
+            for d, m in zip(reversed(self.digits(residues)), reversed(self.moduli)):
+                x = x * m + d  # Horner's rule on the mixed-radix digits.
+            return x
+        # x = sum r_i s_i (M/m_i), combined up the tree: (a, b) -> a * (right product) + b * (left product).
+        values = [r * s % m for r, s, m in zip(residues, self.cofactor_inverses, self.moduli)]
+        for level in self.tree[:-1]:
+            values = [values[i] * level[i + 1] + values[i + 1] * level[i] if i + 1 < len(values) else values[i]
+                      for i in range(0, len(values), 2)]
+        return values[0] % self.modulus
+
+    def reconstruct_batch(self, rows):
+        '''
+        reconstruct for every residue vector in rows (a sequence of vectors, or an N x k array).
+        With every modulus below 2^31 the Garner digits are computed with NumPy for all rows at once;
+        the result is a list of Python ints, or a NumPy uint64 array if M < 2^64.
+        '''
+        import numpy as np
+        if max(self.moduli) >= 2**31:
+            return [self.reconstruct(row) for row in rows]
+        residues = np.asarray(rows, dtype=np.int64).reshape(-1, len(self.moduli))
+        v = []
+        for i, m in enumerate(self.moduli):
+            x = np.zeros(len(residues), dtype=np.int64)
+            for d, P in zip(v, self.partial[i]):
+                x = (x + d * P) % m
+            v.append((residues[:, i] - x) % m * self.garner[i] % m)
+        if self.modulus < 2**64:
+            x = np.zeros(len(residues), dtype=np.uint64)
+            for d, m in zip(reversed(v), reversed(self.moduli)):
+                x = x * np.uint64(m) + d.astype(np.uint64)
+            return x
+        columns = [d.tolist() for d in reversed(v)]
+        result = []
+        for digits in zip(*columns):
+            x = 0
+            for d, m in zip(digits, reversed(self.moduli)):
+                x = x * m + d
+            result.append(x)
+        return result
+
+    def reduce(self, x):
+        '''The residues of x modulo each modulus.'''
+        if len(self.moduli) < TREE_THRESHOLD:
+            return [x % m for m in self.moduli]
+        return remainder_tree(x, self.tree)
+
+    # Residue number system: an integer in [0, M) is its vector of residues, and addition and
+    # multiplication work on each residue independently.
+
+    def add(self, a, b):
+        return [(x + y) % m for x, y, m in zip(a, b, self.moduli)]
+
+    def mul(self, a, b):
+        return [x * y % m for x, y, m in zip(a, b, self.moduli)]
+
+    def multiply(self, a, b):
+        '''a * b for nonnegative a and b with a * b < M, computed in the residue number system.'''
+        if a < 0 or b < 0:
+            raise ValueError("RNS multiplication needs nonnegative integers")
+        return self.reconstruct(self.mul(self.reduce(a), self.reduce(b)))
+
+
+if __name__ == '__main__':
+    import random
+    import numpy as np
+    from EratosthenesSieve import base_primes
+    from primegen import random_prime
+
+    # Few moduli: CRT-RSA recombination, m = m_p (mod p), m = m_q (mod q), for many messages.
+    p, q = random_prime(1024), random_prime(1024)
+    ctx = CRT([p, q])
+    messages = [random.randrange(p * q) for _ in range(20000)]
+    pairs = [(m % p, m % q) for m in messages]
+    start = time.perf_counter()
+    result = [ctx.reconstruct(r) for r in pairs]
+    t_ctx = time.perf_counter() - start
+    start = time.perf_counter()
+    textbook = [(mp * q * pow(q, -1, p) + mq * p * pow(p, -1, q)) % (p * q) for mp, mq in pairs]
+    t_textbook = time.perf_counter() - start
+    assert result == textbook == messages
+    print(f"CRT-RSA recombination: {1e6 * t_ctx / len(pairs):.1f} us per message with CRT, "
+          f"{1e6 * t_textbook / len(pairs):.1f} us recomputing the inverses")
+
+    # Batch mode: a million residue vectors over small moduli.
+    moduli = base_primes(200)[-6:]
+    ctx = CRT(moduli)
+    values = np.random.randint(0, ctx.modulus, size=10**6, dtype=np.int64)
+    rows = np.stack([values % m for m in moduli], axis=1)
+    start = time.perf_counter()
+    batch = ctx.reconstruct_batch(rows)
+    t_batch = time.perf_counter() - start
+    assert (batch == values.astype(np.uint64)).all()
+    start = time.perf_counter()
+    one_by_one = [ctx.reconstruct(row) for row in rows[:20000].tolist()]
+    t_one = (time.perf_counter() - start) / 20000 * len(rows)
+    print(f"{len(rows)} vectors over {len(moduli)} moduli: {t_batch:.3f} s in batch, "
+          f"{t_one:.2f} s one at a time (estimated)")
+
+    # Many moduli: the product tree against Garner's quadratic loop.
+    moduli = [random_prime(64) for _ in range(512)]
+    ctx = CRT(moduli)
+    x = random.randrange(ctx.modulus)
+    start = time.perf_counter()
+    residues = ctx.reduce(x)
+    assert ctx.reconstruct(residues) == x
+    t_tree = time.perf_counter() - start
+    start = time.perf_counter()
+    digits = ctx.digits([x % m for m in moduli])
+    t_garner = time.perf_counter() - start
+    print(f"{len(moduli)} 64-bit moduli: reduce + reconstruct {t_tree * 1000:.1f} ms with the tree, "
+          f"Garner's digits alone {t_garner * 1000:.1f} ms")
+
+    # RNS multiplication of two numbers of M/2 bits each.
+    half = ctx.modulus.bit_length() // 2 - 1
+    a, b = random.getrandbits(half), random.getrandbits(half)
+    start = time.perf_counter()
+    assert ctx.multiply(a, b) == a * b
+    t_rns = time.perf_counter() - start
+    start = time.perf_counter()
+    a * b
+    print(f"{half}-bit product: {t_rns * 1000:.1f} ms in RNS (with the conversions), "
+          f"{(time.perf_counter() - start) * 1000:.3f} ms with Python's multiplication")
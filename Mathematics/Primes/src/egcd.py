@@ -0,0 +1,198 @@
+'''
+Extended Euclidean algorithm, shared by LDE.py and Hensel.py.
+
+    egcd(a, b)                -> (g, x, y) with a*x + b*y = g = gcd(a, b)
+    solve_lde(a, b, c)        -> (x, y, step_x, step_y): every solution of a*x + b*y = c is
+                                 (x + step_x*n, y - step_y*n); None if there is none
+    solve_lde_batch(a, b, c)  -> the same for whole arrays of (a, b, c), vectorized with NumPy
+
+egcd picks the algorithm by size.  Small operands use the textbook loop (euclid_egcd).  For large
+ones, Lehmer's algorithm (lehmer_egcd) runs the Euclidean steps on the leading 62 bits only, as
+machine-size integers, collecting them in a 2x2 matrix that is then applied to the full numbers
+once: one multi-precision update replaces many multi-precision divisions.  binary_egcd
+is Stein's binary version (shifts and subtractions only), kept for comparison.
+
+Nothing here prints; the functions in LDE.py print the explanations on top of these.
+
+Usage (benchmark):
+    python egcd.py
+'''
+
+import random
+import time
+from math import gcd
+
+LEHMER_THRESHOLD = 2048  # Bits from which egcd switches to Lehmer's algorithm.
+_DIGIT = 62  # Leading bits simulated per Lehmer step.
+
+def euclid_egcd(a, b):
+    '''The textbook extended Euclidean algorithm on a, b >= 0.  Returns (g, x, y).'''
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q*x1
+        y0, y1 = y1, y0 - q*y1
+    return a, x0, y0
+
+def lehmer_egcd(a, b):
+    '''Lehmer's extended gcd on a, b >= 0 (Knuth, TAOCP vol. 2, Algorithm 4.5.2L).  Returns (g, x, y).'''
+    a0, b0 = a, b
+    if a < b:
+        a, b = b, a
+    ua, ub = 1, 0  # The coefficients of a0 in a and b (or of b0, when the inputs were swapped).
+    while b.bit_length() > _DIGIT:
+        shift = a.bit_length() - _DIGIT
+        ah, bh = a >> shift, b >> shift
+        # Run Euclid on the leading digits for as long as the quotients are certain to be right.
+        A, B, C, D = 1, 0, 0, 1
+        while bh + C and bh + D:
+            q = (ah + A) // (bh + C)
+            if q != (ah + B) // (bh + D):
+                break
+            A, B, C, D = C, D, A - q*C, B - q*D
+            ah, bh = bh, ah - q*bh
+        if B == 0:  # No step was certain: do one full division.
+            q, r = divmod(a, b)
+            a, b = b, r
+            ua, ub = ub, ua - q*ub
+        else:
+            a, b = A*a + B*b, C*a + D*b
+            ua, ub = A*ua + B*ub, C*ua + D*ub
+    g, s, t = euclid_egcd(a, b)
+    x = s*ua + t*ub
+    if a0 < b0:  # x is the coefficient of b0.
+        return g, (g - b0*x) // a0 if a0 else 0, x
+    return g, x, (g - a0*x) // b0 if b0 else 0
+
+def binary_egcd(a, b):
+    '''Stein's binary extended gcd on a, b >= 0 (Menezes et al., HAC Algorithm 14.61).  Returns (g, x, y).'''
+    if not a or not b:
+        return (a, 1, 0) if a else (b, 0, 1)
+    shift = ((a | b) & -(a | b)).bit_length() - 1  # The power of 2 dividing both.
+    x, y = a >> shift, b >> shift
+    u, v = x, y
+    A, B, C, D = 1, 0, 0, 1  # x*A + y*B = u and x*C + y*D = v
+    while u:
+        while not u & 1:
+            u >>= 1
+            if A & 1 or B & 1:
+                A, B = A + y, B - x
+            A, B = A >> 1, B >> 1
+        while not v & 1:
+            v >>= 1
+            if C & 1 or D & 1:
+                C, D = C + y, D - x
+            C, D = C >> 1, D >> 1
+        if u >= v:
+            u, A, B = u - v, A - C, B - D
+        else:
+            v, C, D = v - u, C - A, D - B
+    return v << shift, C, D
+
+def egcd(a, b):
+    '''
+    (g, x, y) with a*x + b*y = g = gcd(a, b) >= 0, for any integers a and b.
+    '''
+    if max(abs(a), abs(b)).bit_length() < LEHMER_THRESHOLD:
+        g, x, y = euclid_egcd(abs(a), abs(b))
+    else:
+        g, x, y = lehmer_egcd(abs(a), abs(b))
+    return g, x if a >= 0 else -x, y if b >= 0 else -y
+
+def solve_lde(a, b, c):
+    '''
+    The solutions of the linear Diophantine equation a*x + b*y = c, as (x, y, step_x, step_y):
+    they are x + step_x*n, y - step_y*n for every integer n, and 0 <= x < |step_x| when step_x != 0.
+    Returns None if there is no solution.
+    '''
+    g, x, y = egcd(a, b)
+    if g == 0:
+        return (0, 0, 0, 0) if c == 0 else None
+    if c % g:
+        return None
+    step_x, step_y = b // g, a // g
+    x *= c // g
+    if step_x:
+        x %= abs(step_x)
+        y = (c - a*x) // b
+    else:
+        y *= c // g
+    return x, y, step_x, step_y
+
+def solve_lde_batch(a, b, c):
+    '''
+    solve_lde for arrays a, b, c of the same length, with every |value| < 2^31.
+    Returns (solvable, x, y, step_x, step_y) as NumPy arrays: solvable is a boolean mask,
+    and the other arrays hold solve_lde's answer where it is True (zeros elsewhere).
+    '''
+    import numpy as np
+    a, b, c = (np.asarray(v, dtype=np.int64) for v in (a, b, c))
+    if max(np.abs(v).max(initial=0) for v in (a, b, c)) >= 2**31:
+        raise ValueError("solve_lde_batch needs |a|, |b|, |c| < 2^31; use solve_lde for larger values")
+
+    # Euclid on |a|, |b|, every equation at once; the finished ones stop changing.
+    r0, r1 = np.abs(a), np.abs(b)
+    s0, s1 = np.ones_like(a), np.zeros_like(a)
+    active = r1 != 0
+    while active.any():
+        q = r0 // np.where(active, r1, 1)
+        r0, r1 = np.where(active, r1, r0), np.where(active, r0 - q*r1, r1)
+        s0, s1 = np.where(active, s1, s0), np.where(active, s0 - q*s1, s1)
+        active = r1 != 0
+    g = r0
+    s0 = np.where(a < 0, -s0, s0)  # Now a*s0 = g (mod b).
+
+    safe_g = np.where(g == 0, 1, g)
+    solvable = np.where(g == 0, c == 0, c % safe_g == 0)
+    step_x, step_y = b // safe_g, a // safe_g
+    modulus = np.where(step_x == 0, 1, np.abs(step_x))
+    x = (s0 % modulus) * ((c // safe_g) % modulus) % modulus  # Each factor is below 2^31.
+    x = np.where(step_x == 0, np.where(a == 0, 0, c // np.where(a == 0, 1, a)), x)
+    y = np.where(b == 0, 0, (c - a*x) // np.where(b == 0, 1, b))
+    zero = np.zeros_like(a)
+    return (solvable, np.where(solvable, x, zero), np.where(solvable, y, zero),
+            np.where(solvable, step_x, zero), np.where(solvable, step_y, zero))
+
+
+if __name__ == '__main__':
+    import numpy as np
+
+    for bits in (64, 1024, 4096, 16384, 65536):
+        pairs = [(random.getrandbits(bits), random.getrandbits(bits) | 1) for _ in range(max(2, 200000 // bits))]
+        print(f"\n{bits}-bit operands ({len(pairs)} pairs), microseconds per pair:")
+        timings = {}
+        for name, f in (('math.gcd (no cofactors)', gcd), ('pow(a, -1, m)', None), ('euclid_egcd', euclid_egcd),
+                        ('lehmer_egcd', lehmer_egcd), ('binary_egcd', binary_egcd), ('egcd', egcd)):
+            if name == 'binary_egcd' and bits > 4096:
+                continue  # Quadratic in the bit length with slow steps: minutes in pure Python.
+            start = time.perf_counter()
+            if f is None:
+                for a, m in pairs:
+                    try:
+                        pow(a, -1, m)
+                    except ValueError:
+                        pass
+            else:
+                for a, b in pairs:
+                    f(a, b)
+            timings[name] = 1e6 * (time.perf_counter() - start) / len(pairs)
+            print(f"  {name:<24} {timings[name]:12.1f}")
+        for f in (euclid_egcd, lehmer_egcd, binary_egcd, egcd):
+            for a, b in pairs[:5]:
+                if f is binary_egcd and bits > 4096:
+                    continue
+                g, x, y = f(a, b)
+                assert g == gcd(a, b) and a*x + b*y == g
+
+    n = 10**6
+    a, b, c = (np.random.randint(-2**31 + 1, 2**31, size=n, dtype=np.int64) for _ in range(3))
+    start = time.perf_counter()
+    solvable, x, y, step_x, step_y = solve_lde_batch(a, b, c)
+    t_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    loop = [solve_lde(int(u), int(v), int(w)) for u, v, w in zip(a[:100000], b[:100000], c[:100000])]
+    t_loop = (time.perf_counter() - start) * n / 100000
+    assert [None if s is None else s[:2] for s in loop] == \
+        [(int(u), int(v)) if ok else None for ok, u, v in zip(solvable[:100000], x[:100000], y[:100000])]
+    print(f"\n{n} equations ax + by = c: {t_batch:.2f} s with solve_lde_batch, {t_loop:.2f} s with solve_lde (estimated)")
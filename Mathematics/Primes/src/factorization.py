@@ -0,0 +1,377 @@
+'''
+Integer factorization for the Primes package.
+
+    factorint(n, time_budget=None, stats=None) -> {prime: exponent}
+
+The stages, cheapest first:
+1. Trial division by a table of the primes below 2^16.
+2. Pollard's rho with Brent's cycle detection.  The differences |x - y| are multiplied together
+   mod n and only every BATCH-th product goes through a gcd.
+3. Pollard's p - 1.  Stage 1 raises 2 to every prime power below B1; stage 2 walks the primes q
+   up to B2, stepping from a^q to the next a^q' with a table of a^gap for the (few) prime gaps.
+4. Lenstra's elliptic curve method on Montgomery curves By^2 = x^3 + Ax^2 + x (Suyama's
+   parametrization), using only x and z coordinates and the Montgomery ladder.  Stage 2 is the
+   baby-step giant-step continuation: q = mD +- j is caught by x([mD]Q) z([j]Q) - x([j]Q) z([mD]Q).
+
+factorint escalates by size: numbers below 2^64 go straight to rho, which needs about n^(1/4)
+steps; larger ones get a short rho run (for small factors), one p - 1 attempt, then ECM with
+growing bounds.  When a multiple e of the exponent of (Z/nZ)* is known (e = n - 1 for a
+Carmichael number), square roots of 1 give a much faster split: split_with_exponent(n, e).
+
+Every stage checks a deadline, and factorint raises TimeoutError once time_budget seconds are
+spent.  Pass a dict as stats to collect the calls, seconds and factors found per stage.
+
+Usage (benchmark):
+    python factorization.py [digits]
+'''
+
+import random
+import sys
+import time
+from functools import lru_cache
+from math import gcd
+
+from EratosthenesSieve import base_primes, segmented_primes
+from primality import TRIAL_BOUND, _PRIMORIAL, is_prime
+
+TRIAL_LIMIT = 1 << 16  # factorint divides by every prime below this.
+BATCH = 128  # Rho steps per gcd.
+RHO_STEPS = 1 << 16  # Rho steps before moving on to p - 1 and ECM (enough for factors up to about 2^32).
+PM1_BOUNDS = (20000, 2000000)  # (B1, B2) for the single p - 1 attempt.
+# (B1, curves): the stage-1 bounds tried in turn, each good for factors up to about 15, 20, 25, 30 digits.
+ECM_SCHEDULE = ((2000, 25), (11000, 90), (50000, 300), (250000, 700))
+ECM_B2 = 50  # Stage 2 goes up to B2 = ECM_B2 * B1.
+ECM_D = 210  # Giant step of the ECM stage 2.
+
+@lru_cache(maxsize=None)
+def _primes_upto(bound):
+    return tuple(base_primes(bound))
+
+@lru_cache(maxsize=8)
+def _primes_between(lo, hi):
+    '''The primes in (lo, hi].'''
+    return tuple(segmented_primes(lo + 1, hi + 1))
+
+def _check(deadline):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise TimeoutError("factorization ran out of time")
+
+def trial_division(n, bound=TRIAL_BOUND):
+    '''
+    Divide out every prime up to bound.  Returns ({prime: exponent}, cofactor).
+    '''
+    factors = {}
+    if bound <= TRIAL_BOUND and gcd(n, _PRIMORIAL) == 1:
+        return factors, n
+    for p in _primes_upto(bound):
+        if p * p > n:
+            if n > 1:  # No factor up to its square root: what is left is prime.
+                factors[n] = factors.get(n, 0) + 1
+                n = 1
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+    return factors, n
+
+def split_with_exponent(n, e, attempts=32):
+    '''
+    Find a nontrivial factor of odd composite n, given e with a^e = 1 (mod n) for the bases tried
+    (e is a multiple of the exponent of (Z/nZ)*, such as n - 1 for a Carmichael number).
+    Writing e = 2^s * d, the sequence a^d, a^2d, ... reaches 1, and the term before that is a
+    square root of 1; unless it is -1, gcd(root - 1, n) is a proper factor.  Returns None if no base works.
+    '''
+    s = (e & -e).bit_length() - 1
+    d = e >> s
+    for _ in range(attempts):
+        a = random.randrange(2, n - 1)
+        g = gcd(a, n)
+        if g > 1:
+            return g
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s):
+            y = x * x % n
+            if y == 1:
+                return gcd(x - 1, n)
+            if y == n - 1:
+                break
+            x = y
+    return None
+
+def pollard_rho_brent(n, c=1, max_steps=None, deadline=None):
+    '''
+    Pollard's rho with the map x -> x^2 + c and Brent's cycle detection.
+    Returns a nontrivial factor of n, or None when the walk closes up on n itself or runs past max_steps.
+    '''
+    y, r, q, g = 2, 1, 1, 1
+    steps = 0
+    while g == 1:
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            ys = y
+            for _ in range(min(BATCH, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = gcd(q, n)
+            k += BATCH
+        steps += 2 * r
+        if max_steps is not None and steps > max_steps:
+            return None
+        _check(deadline)
+        r *= 2
+    if g == n:  # The batch overshot: redo it one gcd at a time.
+        while True:
+            ys = (ys * ys + c) % n
+            g = gcd(abs(x - ys), n)
+            if g > 1:
+                break
+    return g if g != n else None
+
+def _xdbl(x, z, a24, n):
+    s, t = (x + z) ** 2 % n, (x - z) ** 2 % n
+    u = s - t
+    return s * t % n, u * (t + a24 * u) % n
+
+def _xadd(xp, zp, xq, zq, xd, zd, n):
+    u = (xp - zp) * (xq + zq)
+    v = (xp + zp) * (xq - zq)
+    return zd * (u + v) ** 2 % n, xd * (u - v) ** 2 % n
+
+def _ladder(k, x, z, a24, n):
+    '''The x and z coordinates of [k]P, for P = (x : z).'''
+    x0, z0 = x, z
+    x1, z1 = _xdbl(x, z, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            x0, z0 = _xadd(x1, z1, x0, z0, x, z, n)
+            x1, z1 = _xdbl(x1, z1, a24, n)
+        else:
+            x1, z1 = _xadd(x1, z1, x0, z0, x, z, n)
+            x0, z0 = _xdbl(x0, z0, a24, n)
+    return x0, z0
+
+def _prime_power_below(p, bound):
+    q = p
+    while q * p <= bound:
+        q *= p
+    return q
+
+def pollard_pm1(n, B1, B2=None, deadline=None):
+    '''
+    Pollard's p - 1 with base 2: finds a prime factor p of n when p - 1 is a product of prime
+    powers below B1 and at most one more prime below B2 (by default 100 * B1).
+    Returns a nontrivial factor of n, or None.
+    '''
+    a = 2
+    for i, p in enumerate(_primes_upto(B1)):
+        a = pow(a, _prime_power_below(p, B1), n)
+        if i % 1024 == 1023:
+            _check(deadline)
+    g = gcd(a - 1, n)
+    if g > 1:
+        return g if g < n else None
+
+    primes = _primes_between(B1, B2 or 100 * B1)
+    if not primes:
+        return None
+    steps = {}  # a^gap for each gap between consecutive primes.
+    x = pow(a, primes[0], n)
+    product = x - 1
+    for i in range(1, len(primes)):
+        gap = primes[i] - primes[i - 1]
+        if gap not in steps:
+            steps[gap] = pow(a, gap, n)
+        x = x * steps[gap] % n
+        product = product * (x - 1) % n
+        if i % 2048 == 0:
+            _check(deadline)
+    g = gcd(product, n)
+    return g if 1 < g < n else None
+
+@lru_cache(maxsize=None)
+def _stage1_multiplier(B1):
+    '''The product of the largest power below B1 of every prime below B1.'''
+    k = 1
+    for p in _primes_upto(B1):
+        k *= _prime_power_below(p, B1)
+    return k
+
+@lru_cache(maxsize=8)
+def _stage2_pairs(B1, B2, D):
+    '''
+    The primes q in (B1, B2] as q = mD +- j with 0 < j < D/2: a dictionary {m: (j, ...)}.
+    '''
+    pairs = {}
+    for q in _primes_between(B1, B2):
+        m = (q + D // 2) // D
+        pairs.setdefault(m, []).append(abs(q - m * D))
+    return {m: tuple(js) for m, js in pairs.items()}
+
+def _ecm_stage2(x, z, a24, n, B1, B2, D=ECM_D):
+    '''
+    The stage 2 product of x([mD]Q) z([j]Q) - x([j]Q) z([mD]Q) over the primes q = mD +- j in (B1, B2].
+    It is 0 mod p exactly when [q]Q = O mod p for one of those q.
+    '''
+    pairs = _stage2_pairs(B1, B2, D)
+    if not pairs:
+        return 1
+    # Baby steps: [j]Q for odd j < D/2, each from the previous two.
+    two = _xdbl(x, z, a24, n)
+    babies = {1: (x, z), 3: _xadd(*two, x, z, x, z, n)}
+    for j in range(5, D // 2, 2):
+        babies[j] = _xadd(*babies[j - 2], *two, *babies[j - 4], n)
+    # Giant steps: R = [mD]Q, from R_(m+1) = R_m + G with R_m - G = R_(m-1).
+    gx, gz = _ladder(D, x, z, a24, n)
+    m, last = min(pairs), max(pairs)
+    rx, rz = _ladder(m * D, x, z, a24, n)
+    px, pz = _ladder((m - 1) * D, x, z, a24, n)
+    product = 1
+    while True:
+        for j in pairs.get(m, ()):
+            jx, jz = babies[j]
+            product = product * (rx * jz - jx * rz) % n
+        if m == last:
+            return product
+        (rx, rz), (px, pz) = _xadd(rx, rz, gx, gz, px, pz, n), (rx, rz)
+        m += 1
+
+def ecm(n, B1, curves, B2=None, deadline=None):
+    '''
+    Lenstra's elliptic curve method on up to curves random Montgomery curves, with stage 1 up to B1
+    and stage 2 up to B2 (by default ECM_B2 * B1).
+    Returns a nontrivial factor of n, or None.
+    '''
+    k = _stage1_multiplier(B1)
+    B2 = B2 or ECM_B2 * B1
+    for _ in range(curves):
+        _check(deadline)
+        sigma = random.randrange(6, n - 1)
+        u, v = (sigma * sigma - 5) % n, 4 * sigma % n
+        x, z = pow(u, 3, n), pow(v, 3, n)
+        denominator = 16 * x * v % n
+        g = gcd(denominator, n)
+        if g > 1:
+            return g if g < n else None
+        a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n  # (A + 2)/4
+        x, z = _ladder(k, x, z, a24, n)
+        g = gcd(z, n)
+        if g == 1:
+            g = gcd(_ecm_stage2(x, z, a24, n, B1, B2), n)
+        if 1 < g < n:
+            return g
+    return None
+
+def _iroot(n, k):
+    '''The integer k-th root of n, rounded down.'''
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+def _perfect_power(n):
+    '''(root, k) with root^k = n and k > 1 as large as possible, or (n, 1).'''
+    for k in range(n.bit_length(), 1, -1):
+        root = _iroot(n, k)
+        if root > 1 and root ** k == n:
+            return root, k
+    return n, 1
+
+def _timed(stats, stage, function, *args, **kwargs):
+    '''Run one stage, adding its time (and whether it found a factor) to stats.'''
+    if stats is None:
+        return function(*args, **kwargs)
+    entry = stats.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'factors': 0})
+    start = time.perf_counter()
+    try:
+        g = function(*args, **kwargs)
+    finally:
+        entry['calls'] += 1
+        entry['seconds'] += time.perf_counter() - start
+    entry['factors'] += g is not None
+    return g
+
+def _split(n, deadline, exponent, stats):
+    '''A nontrivial factor of the odd composite n, which has no prime factor below TRIAL_LIMIT.'''
+    if exponent is not None:
+        g = _timed(stats, 'exponent', split_with_exponent, n, exponent)
+        if g:
+            return g
+    if n < 2**64:
+        # A factor is below 2^32, so rho needs about 2^16 steps: nothing else is worth setting up.
+        c = 1
+        while True:
+            g = _timed(stats, 'rho', pollard_rho_brent, n, c, deadline=deadline)
+            if g:
+                return g
+            c += 2
+    g = _timed(stats, 'rho', pollard_rho_brent, n, max_steps=RHO_STEPS, deadline=deadline)
+    if g:
+        return g
+    g = _timed(stats, 'p-1', pollard_pm1, n, *PM1_BOUNDS, deadline=deadline)
+    if g:
+        return g
+    for B1, curves in ECM_SCHEDULE:
+        g = _timed(stats, f'ecm B1={B1}', ecm, n, B1, curves, deadline=deadline)
+        if g:
+            return g
+    c = 3
+    while True:  # Nothing found in reasonable time: keep walking until the deadline.
+        g = _timed(stats, 'rho', pollard_rho_brent, n, c, deadline=deadline)
+        if g:
+            return g
+        c += 2
+
+def factorint(n, time_budget=None, exponent=None, stats=None):
+    '''
+    The prime factorization of n > 0, as a dictionary {prime: exponent}.
+    exponent, if given, is a multiple of the exponent of (Z/nZ)* (see split_with_exponent).
+    stats, if given, is a dict that collects {stage: {'calls', 'seconds', 'factors'}}.
+    Raises TimeoutError after time_budget seconds, and ValueError if n < 1.
+    '''
+    if n < 1:
+        raise ValueError(f"factorint needs n > 0, got {n}")
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    start = time.perf_counter()
+    factors, n = trial_division(n, TRIAL_LIMIT)
+    if stats is not None:
+        stats['trial'] = {'calls': 1, 'seconds': time.perf_counter() - start, 'factors': len(factors)}
+    stack = [(n, 1)] if n > 1 else []
+    while stack:
+        m, e = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + e
+            continue
+        root, k = _perfect_power(m)
+        if k > 1:
+            stack.append((root, e * k))
+            continue
+        g = _split(m, deadline, exponent, stats)
+        stack += [(g, e), (m // g, e)]
+    return dict(sorted(factors.items()))
+
+
+if __name__ == '__main__':
+    from primegen import random_prime
+
+    digits = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    bits = int(digits * 3.32)
+    for name, sizes in (('rho', (bits // 4, bits - bits // 4)), ('ecm', (bits // 3, bits - bits // 3)),
+                        ('balanced', (bits // 2, bits - bits // 2))):
+        p, q = (random_prime(b) for b in sizes)
+        stats = {}
+        start = time.perf_counter()
+        try:
+            factors = factorint(p * q, time_budget=120, stats=stats)
+            assert factors == dict(sorted({p: 1, q: 1}.items()))
+            print(f"{name} {sizes} bits: {time.perf_counter() - start:.3f} s")
+        except TimeoutError:
+            print(f"{name} {sizes} bits: no factor in 120 s")
+        for stage, entry in stats.items():
+            print(f"  {stage:<14} {entry['calls']:4} calls {entry['seconds']:9.3f} s  {entry['factors']} factors")
@@ -1,4 +1,3 @@
-from Crypto.Util.number import getPrime
 import random
 from math import gcd as GCD
 
@@ -11,10 +10,15 @@ def fermat_test(n, k):
         if pow(a, n - 1, n) != 1:
             return 'Composite'
     return 'Probably prime'    
-print(fermat_test(2403, 12))  # Composite number
 
-p = getPrime(512)
-print(fermat_test(p, 100))   # Large probable prime  
 
-print(f"561 is {fermat_test(561, 100)} but 561 % 3 = {561 % 3}")     # 561 is Carmichael
-print(f"41041 is {fermat_test(41041, 100)} but 41041 % 11 = {41041 % 11}")  # 41041 is also Carmichael
\ No newline at end of file
+if __name__ == '__main__':
+    from primegen import random_prime
+
+    print(fermat_test(2403, 12))  # Composite number
+
+    p = random_prime(512)
+    print(fermat_test(p, 100))   # Large probable prime  
+
+    print(f"561 is {fermat_test(561, 100)} but 561 % 3 = {561 % 3}")     # 561 is Carmichael
+    print(f"41041 is {fermat_test(41041, 100)} but 41041 % 11 = {41041 % 11}")  # 41041 is also Carmichael
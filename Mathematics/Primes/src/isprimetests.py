@@ -1,6 +1,8 @@
 import timeit
 from math import sqrt
 
+from factorization import factorint
+
 
 def is_prime(n):
     '''
@@ -43,16 +45,36 @@ def is_prime_fast(n):
         j += 1
     return True
 
+def is_prime_factorint(n):
+    '''
+    Checks whether n is a prime number.
+    Factors n with factorization.factorint (trial division, Pollard rho, p-1, ECM)
+    instead of trying every j, so it also works for numbers far too big for the loops above.
+    '''
+    if n < 2:
+        return False
+    factors = factorint(n)
+    if factors == {n: 1}:
+        return True
+    print(f"{min(factors)} is a factor of {n}.")
+    return False
+
 
+if __name__ == '__main__':
+    # Example number to test for primality
+    n = 10**5 + 7
 
-# Example number to test for primality
-n = 10**5 + 7
+    # Measure execution times
+    t1 = timeit.timeit('is_prime(n)', globals=globals(), number=10)
+    t2 = timeit.timeit('is_prime_slow(n)', globals=globals(), number=10)
+    t3 = timeit.timeit('is_prime_fast(n)', globals=globals(), number=10)
+    t4 = timeit.timeit('is_prime_factorint(n)', globals=globals(), number=10)
 
-# Measure execution times
-t1 = timeit.timeit('is_prime(n)', globals=globals(), number=10)
-t2 = timeit.timeit('is_prime_slow(n)', globals=globals(), number=10)
-t3 = timeit.timeit('is_prime_fast(n)', globals=globals(), number=10)
+    print(f"is_prime:      {t1:.6f} seconds (avg over 10 runs)")
+    print(f"is_prime_slow: {t2:.6f} seconds (avg over 10 runs)")
+    print(f"is_prime_fast: {t3:.6f} seconds (avg over 10 runs)")
+    print(f"is_prime_factorint: {t4:.6f} seconds (avg over 10 runs)")
 
-print(f"is_prime:      {t1:.6f} seconds (avg over 10 runs)")
-print(f"is_prime_slow: {t2:.6f} seconds (avg over 10 runs)")
-print(f"is_prime_fast: {t3:.6f} seconds (avg over 10 runs)")
\ No newline at end of file
+    # A product of two 15-digit primes: hopeless for the loops above.
+    n = 100000000000031 * 999999999999989
+    print(is_prime_factorint(n))
@@ -0,0 +1,175 @@
+'''
+Fermat, Euler and strong liars of odd composite numbers.
+
+    liar_counts(n)  -> {'fermat': F, 'euler': E, 'strong': S}, from the factorization of n
+    liars(n)        -> the liars themselves, as NumPy arrays (for n < 2^31)
+    census(lo, hi)  -> a NumPy record array of the counts for every odd composite in [lo, hi)
+
+A base a coprime to n is a Fermat liar if a^(n-1) = 1 (mod n), an Euler liar if
+a^((n-1)/2) = (a|n) (mod n), and a strong liar if Miller-Rabin to the base a says "probably prime".
+
+Counting the liars needs no exponentiation at all (Monier, 1980).  Write n = p1^e1 ... pk^ek,
+n - 1 = 2^s d and pi - 1 = 2^si di with d and di odd, and r = min si.  Then
+
+    F(n) = prod gcd(n - 1, pi - 1)
+    S(n) = (1 + (2^(rk) - 1) / (2^k - 1)) * prod gcd(d, di)
+    E(n) = delta * prod gcd((n - 1)/2, pi - 1),  where delta = 2 if r = s,
+           1/2 if some pi with si < s has ei odd, and 1 otherwise.
+
+liars(n) finds the liars themselves by running the three tests on every base at once,
+vectorized over a NumPy array of bases.  census factors every number of the range with a
+smallest-prime-factor sieve and applies the formulas; its result is cached on disk.
+
+Usage:
+    python liars.py [n ...]
+'''
+
+import os
+import sys
+import time
+from math import gcd, prod
+
+from factorization import factorint
+from jacobi import jacobi_batch
+
+def _counts(n, factors):
+    '''liar_counts from the factorization {p: e} of odd composite n.'''
+    s = ((n - 1) & (1 - n)).bit_length() - 1
+    d = (n - 1) >> s
+    k = len(factors)
+    two_adic = {p: ((p - 1) & (1 - p)).bit_length() - 1 for p in factors}
+    r = min(two_adic.values())
+
+    fermat = prod(gcd(n - 1, p - 1) for p in factors)
+    strong = (1 + ((1 << r*k) - 1) // ((1 << k) - 1)) * prod(gcd(d, (p - 1) >> two_adic[p]) for p in factors)
+    euler = prod(gcd((n - 1) // 2, p - 1) for p in factors)
+    if r == s:
+        euler *= 2
+    elif any(two_adic[p] < s and e & 1 for p, e in factors.items()):
+        euler //= 2
+    return {'fermat': fermat, 'euler': euler, 'strong': strong}
+
+def liar_counts(n, factors=None):
+    '''
+    The number of Fermat, Euler and strong liars in [1, n-1] for odd composite n,
+    counted from the factorization of n (computed with factorint if not given).
+    '''
+    if n < 9 or not n & 1:
+        raise ValueError(f"liars are counted for odd composite n, got {n}")
+    factors = factors or factorint(n)
+    if factors == {n: 1}:
+        raise ValueError(f"{n} is prime")
+    return _counts(n, factors)
+
+def _pow_array(bases, exponent, n):
+    '''bases^exponent mod n for a NumPy int64 array of bases, with n < 2^31 so that products fit.'''
+    import numpy as np
+    result = np.ones_like(bases)
+    for bit in bin(exponent)[2:]:
+        result = result * result % n
+        if bit == '1':
+            result = result * bases % n
+    return result
+
+def liars(n):
+    '''
+    The Fermat, Euler and strong liars of odd composite n < 2^31, as sorted NumPy arrays
+    in a dictionary with the same keys as liar_counts.
+    '''
+    import numpy as np
+    if n < 9 or not n & 1 or n >= 2**31:
+        raise ValueError(f"liars are listed for odd composite n < 2^31, got {n}")
+    bases = np.arange(1, n, dtype=np.int64)
+    bases = bases[np.gcd(bases, n) == 1]
+
+    s = ((n - 1) & (1 - n)).bit_length() - 1
+    x = _pow_array(bases, (n - 1) >> s, n)  # a^d
+    strong = (x == 1) | (x == n - 1)
+    for _ in range(s - 1):
+        x = x * x % n
+        strong |= x == n - 1
+    half = x  # a^(2^(s-1) d) = a^((n-1)/2)
+    fermat = half * half % n == 1
+    symbols = jacobi_batch(bases, n).astype(np.int64) % n  # -1 becomes n - 1.
+    euler = half == symbols
+    return {'fermat': bases[fermat], 'euler': bases[euler], 'strong': bases[strong]}
+
+def _spf_sieve(limit):
+    '''The smallest prime factor of every odd number below limit (index i stands for 2i + 1).'''
+    import numpy as np
+    spf = np.zeros(limit // 2 + 1, dtype=np.int64)
+    for p in range(3, int(limit ** 0.5) + 1, 2):
+        if spf[p // 2] == 0:
+            multiples = spf[p*p // 2::p]
+            multiples[multiples == 0] = p
+    odd = np.arange(1, 2 * len(spf), 2)
+    spf[spf == 0] = odd[spf == 0]  # What is left unmarked is prime.
+    return spf
+
+CENSUS_DTYPE = [('n', 'u8'), ('phi', 'u8'), ('fermat', 'u8'), ('euler', 'u8'), ('strong', 'u8')]
+
+def census(lo, hi, cache_dir=None):
+    '''
+    The liar counts of every odd composite n in [lo, hi), as a NumPy record array with the
+    fields of CENSUS_DTYPE.  The result is cached as a .npy file under cache_dir.
+    '''
+    import numpy as np
+    from primetable import CACHE_DIR
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    path = os.path.join(cache_dir, 'liars', f"census_{lo}_{hi}.npy")
+    if os.path.exists(path):
+        return np.load(path)
+
+    spf = _spf_sieve(hi).tolist()
+    rows = []
+    for n in range(max(lo, 9) | 1, hi, 2):
+        if spf[n // 2] == n:
+            continue  # Prime.
+        factors, m = {}, n
+        while m > 1:
+            p = spf[m // 2]
+            factors[p] = factors.get(p, 0) + 1
+            m //= p
+        counts = _counts(n, factors)
+        phi = prod((p - 1) * p ** (e - 1) for p, e in factors.items())
+        rows.append((n, phi, counts['fermat'], counts['euler'], counts['strong']))
+    table = np.array(rows, dtype=CENSUS_DTYPE)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp, table)
+    os.replace(tmp, path)
+    return table
+
+def format_table(rows):
+    '''Lay out census rows (or dictionaries with the same keys) as a text table.'''
+    lines = [f"{'n':>12} {'phi(n)':>12} {'Fermat':>10} {'Euler':>10} {'strong':>10} {'strong/phi':>10}"]
+    for row in rows:
+        n, phi, fermat, euler, strong = (int(row[name]) for name, _ in CENSUS_DTYPE)
+        lines.append(f"{n:>12} {phi:>12} {fermat:>10} {euler:>10} {strong:>10} {strong / phi:>10.4f}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import tempfile
+    import numpy as np
+
+    for n in [int(arg) for arg in sys.argv[1:]] or [41041, 561, 65]:
+        found = liars(n)
+        counts = liar_counts(n)
+        assert counts == {kind: len(bases) for kind, bases in found.items()}
+        print(f"{n} = {factorint(n)}: strong liars {found['strong'][:10].tolist()} ...")
+
+    cache_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    table = census(1, 10**6, cache_dir)
+    print(f"\nCensus of the {len(table)} odd composites below 10^6 in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    table = census(1, 10**6, cache_dir)
+    print(f"(again, from the cache: {time.perf_counter() - start:.3f} s)")
+
+    worst = table[np.argsort(table['strong'] / table['phi'])[::-1][:10]]
+    print("\nThe ten n with the largest share of strong liars:")
+    print(format_table(worst))
+    print("\nNo n beats the Monier-Rabin bound phi(n)/4 except 9:",
+          table['n'][4 * table['strong'] > table['phi']].tolist())
@@ -1,5 +1,4 @@
 import random
-from Crypto.Util.number import getPrime
 
 def miller_rabin_test(n, k):
     '''
@@ -34,7 +33,11 @@ def miller_rabin_test(n, k):
             return "Composite"
     return "Probably prime"
 
-print(miller_rabin_test(2403, 100))
-p = getPrime(512)
-print(miller_rabin_test(p, 100))
-print(miller_rabin_test(561, 100))
\ No newline at end of file
+
+if __name__ == '__main__':
+    from primegen import random_prime
+
+    print(miller_rabin_test(2403, 100))
+    p = random_prime(512)
+    print(miller_rabin_test(p, 100))
+    print(miller_rabin_test(561, 100))
@@ -1,4 +1,3 @@
-from Crypto.Util.number import getPrime
 import random
 
 def miller_rabin_test(n, k):
@@ -34,6 +33,10 @@ def miller_rabin_test(n, k):
             return "Composite"
     return "Probably prime"
 
-print(miller_rabin_test(2403, 100))
-p = getPrime(512)
-print(miller_rabin_test(p, 100))
\ No newline at end of file
+
+if __name__ == '__main__':
+    from primegen import random_prime
+
+    print(miller_rabin_test(2403, 100))
+    p = random_prime(512)
+    print(miller_rabin_test(p, 100))
@@ -0,0 +1,96 @@
+'''
+A multi-core version of the segmented Sieve of Eratosthenes.
+
+The range [lo, hi) is cut into chunks of whole segments, and the chunks are sieved by a pool of
+worker processes.  The base primes up to sqrt(hi) are computed once in the parent and handed to
+each worker a single time (through the pool initializer), not once per chunk.
+Counts are summed, and primes are streamed back in increasing order.
+
+Usage (benchmark):
+    python parallelsieve.py [hi] [max_workers]
+'''
+
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from math import isqrt
+
+from EratosthenesSieve import SEGMENT_SIZE, base_primes, odd_segments
+
+CHUNK_SEGMENTS = 16  # Segments per task: large enough to amortise the inter-process traffic.
+
+_primes = None  # The odd base primes, set once per worker by _init_worker.
+
+def _init_worker(primes):
+    global _primes
+    _primes = primes
+
+def _count_chunk(bounds):
+    lo, hi = bounds
+    count = 1 if lo <= 2 < hi else 0
+    for _, flags in odd_segments(lo, hi, primes=_primes):
+        count += flags.count(1)
+    return count
+
+def _primes_chunk(bounds):
+    lo, hi = bounds
+    found = [2] if lo <= 2 < hi else []
+    for start, flags in odd_segments(lo, hi, primes=_primes):
+        found.extend(compress(range(start, start + 2*len(flags), 2), flags))
+    return found
+
+def chunks(lo, hi, chunk_size=2*SEGMENT_SIZE*CHUNK_SEGMENTS):
+    '''
+    Split [lo, hi) into consecutive [a, b) pieces of chunk_size integers.
+    chunk_size is kept even so that each piece starts on the same parity as lo.
+    '''
+    chunk_size += chunk_size & 1
+    return [(a, min(a + chunk_size, hi)) for a in range(lo, hi, chunk_size)]
+
+def _pool(hi, max_workers):
+    primes = base_primes(isqrt(max(hi-1, 0)))[1:]
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(primes,))
+
+def parallel_prime_count(lo, hi, max_workers=None):
+    '''
+    Return the number of primes in [lo, hi), sieving chunks of the range on max_workers processes
+    (by default, one per core).
+    '''
+    with _pool(hi, max_workers) as pool:
+        return sum(pool.map(_count_chunk, chunks(lo, hi)))
+
+def parallel_primes(lo, hi, max_workers=None):
+    '''
+    Generate the primes in [lo, hi) in increasing order.
+    At most two chunks per worker are in flight, so memory stays bounded however large the range is.
+    '''
+    max_workers = max_workers or os.cpu_count() or 1
+    pending = deque()
+    with _pool(hi, max_workers) as pool:
+        for bounds in chunks(lo, hi):
+            pending.append(pool.submit(_primes_chunk, bounds))
+            if len(pending) >= 2*max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+if __name__ == '__main__':
+    hi = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**9
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    # Time the count with 1, 2, 4, ... workers to show how the sieve scales with cores.
+    baseline = None
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        count = parallel_prime_count(0, hi, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"pi({hi}) = {count}  workers={workers:<3} {elapsed:8.2f} s  speedup {baseline/elapsed:5.2f}x")
+        if workers >= max_workers:
+            break
+        workers = min(2*workers, max_workers)
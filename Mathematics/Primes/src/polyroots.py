@@ -0,0 +1,134 @@
+'''
+The roots of a polynomial modulo a prime p, in time polynomial in log p and the degree.
+
+    roots_mod_p(coeffs, p) -> sorted list of the distinct roots of f mod p
+
+1. The roots of f are the roots of g = gcd(f, x^p - x), and g is a product of distinct linear
+   factors.  x^p mod f is computed by repeated squaring, so p is never enumerated.
+2. g is split by Cantor-Zassenhaus equal-degree factorization: for a random d, about half of the
+   roots r have r + d a square mod p, and those are exactly the roots of
+   gcd(g, (x + d)^((p-1)/2) - 1).  Splitting recursively isolates every root.
+
+Coefficients are given from the highest power to the lowest, as in Hensel.py.  Internally a
+polynomial is a list of coefficients mod p from the lowest power up.
+
+Usage:
+    python polyroots.py p a_n a_(n-1) ... a_0
+'''
+
+import random
+from sys import argv
+
+SMALL_P = 64  # Below this, trying every residue is cheaper than the gcds.
+
+def _trim(a):
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+def _monic(a, p):
+    inv = pow(a[-1], -1, p)
+    return [c * inv % p for c in a]
+
+def _mod(a, f, p):
+    '''a mod f, for monic f.'''
+    a = a[:]
+    n = len(f) - 1
+    for i in range(len(a) - 1, n - 1, -1):
+        c = a[i]
+        if c:
+            for j in range(n):
+                a[i - n + j] = (a[i - n + j] - c * f[j]) % p
+        a[i] = 0
+    return _trim(a[:n])
+
+def _mulmod(a, b, f, p):
+    '''a * b mod f, for monic f.'''
+    if not a or not b:
+        return []
+    product = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    return _mod([c % p for c in product], f, p)
+
+def _powmod(a, e, f, p):
+    '''a^e mod f, by repeated squaring.'''
+    result = [1]
+    for bit in bin(e)[2:]:
+        result = _mulmod(result, result, f, p)
+        if bit == '1':
+            result = _mulmod(result, a, f, p)
+    return result
+
+def _gcd(a, b, p):
+    '''The monic gcd of a and b.'''
+    while b:
+        b = _monic(b, p)
+        a, b = b, _mod(a, b, p)
+    return _monic(a, p) if a else a
+
+def _sub_one(a, p):
+    '''a - 1.'''
+    a = a[:] or [0]
+    a[0] = (a[0] - 1) % p
+    return _trim(a)
+
+def _divide(a, b, p):
+    '''The quotient a / b, for monic b dividing a.'''
+    a = a[:]
+    n = len(b) - 1
+    q = [0] * (len(a) - n)
+    for i in range(len(a) - 1, n - 1, -1):
+        c = a[i] % p
+        q[i - n] = c
+        if c:
+            for j in range(n + 1):
+                a[i - n + j] = (a[i - n + j] - c * b[j]) % p
+    return q
+
+def _split(g, p):
+    '''The roots of g, a monic product of distinct linear factors, by Cantor-Zassenhaus.'''
+    if len(g) == 1:
+        return []
+    if len(g) == 2:
+        return [-g[0] % p]
+    while True:
+        d = random.randrange(p)
+        h = _gcd(g, _sub_one(_powmod([d, 1], (p - 1) // 2, g, p), p), p)
+        if 1 < len(h) < len(g):
+            quotient = _divide(g, h, p)
+            return _split(h, p) + _split(quotient, p)
+
+def roots_mod_p(coeffs, p):
+    '''
+    The distinct roots in [0, p) of a_n x^n + ... + a_0 mod the prime p, for coeffs = [a_n, ..., a_0].
+    If every coefficient is divisible by p, every residue is a root.
+    '''
+    f = _trim([c % p for c in reversed(coeffs)])
+    if not f:
+        return list(range(p))
+    if p < SMALL_P:
+        return [x for x in range(p) if sum(c * pow(x, i, p) for i, c in enumerate(f)) % p == 0]
+    f = _monic(f, p)
+    if len(f) == 1:
+        return []
+    xp = _powmod([0, 1], p, f, p)  # x^p mod f
+    xp += [0] * (2 - len(xp))
+    xp[1] = (xp[1] - 1) % p  # x^p - x mod f
+    g = _gcd(f, _trim(xp), p)
+    return sorted(_split(g, p))
+
+
+if __name__ == '__main__':
+    if len(argv) > 2:
+        p = int(argv[1])
+        coeffs = [int(a) for a in argv[2:]]
+    else:
+        p = 2**61 - 1
+        coeffs = [1, 0, -2]  # x^2 - 2: the square roots of 2 mod the Mersenne prime 2^61 - 1.
+    roots = roots_mod_p(coeffs, p)
+    print(f"Roots mod {p}:", roots)
+    for r in roots:
+        assert sum(c * pow(r, len(coeffs) - 1 - i, p) for i, c in enumerate(coeffs)) % p == 0
@@ -0,0 +1,187 @@
+'''
+One primality test for the whole Primes package.
+
+    is_prime(n) -> bool
+
+1. Small n are looked up in a table, and trial division by every prime below 1000 is a single
+   gcd with their product.
+2. For n < 2^64, Miller-Rabin is deterministic with the smallest witness set known to
+   suffice below n (the same table primewitness.is_prime walks through).
+3. Larger n get the Baillie-PSW test: a strong probable prime test to base 2 followed by a
+   strong Lucas probable prime test.  No counterexample to BPSW is known.
+
+Running this file benchmarks is_prime against the other tests in this folder and sympy.isprime.
+'''
+
+import random
+import timeit
+from math import gcd, isqrt, prod
+
+from EratosthenesSieve import base_primes
+from jacobi import jacobi_symbol
+
+TRIAL_BOUND = 1000
+SMALL_PRIMES = base_primes(TRIAL_BOUND)
+_SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+_PRIMORIAL = prod(SMALL_PRIMES)
+_TRIAL_LIMIT = 1009**2  # 1009 is the first prime above TRIAL_BOUND: below its square, no small factor means prime.
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)  # Enough for every n < 3.18 * 10^23.
+# (bound, witnesses): Miller-Rabin with these witnesses is deterministic for n < bound.
+# Pomerance, Selfridge and Wagstaff; Jaeschke; Jiang and Deng.
+_MR_WITNESSES = (
+    (2047, DETERMINISTIC_BASES[:1]),
+    (1373653, DETERMINISTIC_BASES[:2]),
+    (25326001, DETERMINISTIC_BASES[:3]),
+    (3215031751, DETERMINISTIC_BASES[:4]),
+    (2152302898747, DETERMINISTIC_BASES[:5]),
+    (3474749660383, DETERMINISTIC_BASES[:6]),
+    (341550071728321, DETERMINISTIC_BASES[:7]),
+    (3825123056546413051, DETERMINISTIC_BASES[:9]),
+    (318665857834031151167461, DETERMINISTIC_BASES),
+)
+
+def strong_probable_prime(n, base):
+    '''
+    The Miller-Rabin test of odd n > 2 to the given base.
+    False means n is composite, True means n is prime or a strong pseudoprime to this base.
+    '''
+    d = n - 1
+    s = (d & -d).bit_length() - 1  # n-1 = 2^s * d with d odd.
+    d >>= s
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+def miller_rabin(n, witnesses):
+    '''
+    Miller-Rabin on odd n > 2 for every witness, splitting n-1 = 2^s * d only once.
+    Returns False as soon as one witness proves n composite.
+    '''
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    for a in witnesses:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def _selfridge(n):
+    '''
+    The first D in 5, -7, 9, -11, ... with (D|n) = -1, or 0 if a D shares a factor with n.
+    n must not be a perfect square (otherwise no such D exists).
+    '''
+    D = 5
+    while True:
+        j = jacobi_symbol(D, n)
+        if j == -1:
+            return D
+        if j == 0 and abs(D) != n:
+            return 0
+        D = -D - 2 if D > 0 else -D + 2
+
+def strong_lucas_probable_prime(n):
+    '''
+    The strong Lucas probable prime test of odd n > 2, with Selfridge's parameters P = 1, Q = (1-D)/4.
+    '''
+    if isqrt(n)**2 == n:
+        return False
+    D = _selfridge(n)
+    if D == 0:
+        return False
+    P, Q = 1, (1 - D) // 4
+
+    d = n + 1
+    s = (d & -d).bit_length() - 1  # n+1 = 2^s * d with d odd.
+    d >>= s
+
+    def half(x):  # x/2 mod n
+        return (x + n if x & 1 else x) >> 1
+
+    # Compute U_d, V_d and Q^d mod n, reading the bits of d from the top.
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V, Qk = U * V % n, (V * V - 2 * Qk) % n, Qk * Qk % n
+        if bit == '1':
+            U, V, Qk = half(P * U + V) % n, half(D * U + P * V) % n, Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V, Qk = (V * V - 2 * Qk) % n, Qk * Qk % n
+        if V == 0:
+            return True
+    return False
+
+def is_prime(n):
+    '''
+    Return True if n is prime and False otherwise.
+    Deterministic for n < 2^64, and Baillie-PSW above that.
+    '''
+    if n <= TRIAL_BOUND:
+        return n in _SMALL_PRIME_SET
+    if gcd(n, _PRIMORIAL) != 1:
+        return False
+    return is_prime_no_small_factor(n)
+
+def is_prime_no_small_factor(n):
+    '''
+    is_prime for n > TRIAL_BOUND that is already known to have no prime factor below TRIAL_BOUND
+    (for instance, because it survived a sieve).
+    '''
+    if n < _TRIAL_LIMIT:
+        return True
+    if n < 2**64:
+        for bound, witnesses in _MR_WITNESSES:
+            if n < bound:
+                return miller_rabin(n, witnesses)
+    return strong_probable_prime(n, 2) and strong_lucas_probable_prime(n)
+
+
+if __name__ == '__main__':
+    from sympy import isprime
+    from fermattest import fermat_test
+    from isprimetests import is_prime_fast
+    from millerrabin import miller_rabin_test
+    from millerrabinfixed import miller_rabin_test_fixed
+    from primewitness import is_prime as primewitness_is_prime
+    from solovaystrassen import solovay_strassen_test
+    import contextlib, io
+
+    small = list(range(5, 20000))  # The randomized tests pick witnesses in [2, n-2], so they need n > 4.
+    word = [random.getrandbits(64) | 1 for _ in range(2000)]
+    large = [random.getrandbits(512) | 1 for _ in range(2000)]
+    # Make sure the large sample has some primes, so the full test runs and not just trial division.
+    large += [p for p in (random.getrandbits(512) | 1 for _ in range(20000)) if isprime(p)][:20]
+
+    tests = {
+        'is_prime': is_prime,
+        'sympy.isprime': isprime,
+        'primewitness.is_prime': primewitness_is_prime,
+        'miller_rabin_test (k=20)': lambda n: miller_rabin_test(n, 20),
+        'miller_rabin_test_fixed': lambda n: miller_rabin_test_fixed(n, DETERMINISTIC_BASES),
+        'fermat_test (k=20)': lambda n: fermat_test(n, 20),
+        'solovay_strassen_test (k=20)': lambda n: solovay_strassen_test(n, 20),
+        'isprimetests.is_prime_fast': is_prime_fast,
+    }
+    samples = {'n < 20000': small, 'random odd 64-bit': word, 'random odd 512-bit': large}
+
+    for sample_name, sample in samples.items():
+        print(f"\n{sample_name} ({len(sample)} numbers)")
+        for name, test in tests.items():
+            if name == 'isprimetests.is_prime_fast' and sample is not small:
+                continue  # Trial division up to sqrt(n) never finishes on big primes.
+            with contextlib.redirect_stdout(io.StringIO()):  # The trial division tests print the factors they find.
+                t = timeit.timeit(lambda: [test(n) for n in sample], number=1)
+            print(f"  {name:<30} {1e6 * t / len(sample):10.2f} us/number")
@@ -0,0 +1,183 @@
+'''
+Fast generation of large random primes.
+
+    random_prime(bits), safe_prime(bits), strong_prime(bits)
+
+Instead of drawing random numbers and testing each one, we pick a random odd start and walk the
+arithmetic progression start, start + step, start + 2*step, ... one window at a time.
+For each of the first few thousand primes s (more for larger primes, where a Miller-Rabin
+test costs more) we remember at which index of the window the next
+multiple of s falls; sieving a window is then a slice assignment per prime, and moving to the
+next window only shifts those indices (no big-number division per candidate).
+Miller-Rabin only ever runs on the survivors.
+
+A safe prime p = 2q + 1 needs both q and p prime, so the sieve removes q whenever q or 2q + 1 has
+a small factor (the double sieve).  Strong primes come from Gordon's algorithm.
+
+Usage (benchmark):
+    python primegen.py [bits ...]
+'''
+
+import random
+import sys
+import time
+from functools import lru_cache
+from itertools import takewhile
+
+from EratosthenesSieve import base_primes
+from primality import is_prime, is_prime_no_small_factor, strong_probable_prime
+
+_random = random.SystemRandom()
+
+@lru_cache(maxsize=None)
+def sieve_primes(bits):
+    '''
+    The odd primes to sieve with when looking for primes of the given size: 3511 primes (below 2^15)
+    at 1024 bits, growing with bits**2 like the cost of a Miller-Rabin test, up to the primes below 2^20.
+    '''
+    return tuple(base_primes(min(max(bits * bits // 32, 1 << 12), 1 << 20))[1:])
+
+def sieved_progression(start, step, forms=((1, 0),), primes=None, window=4096):
+    '''
+    Generate the terms c = start + i*step (i = 0, 1, 2, ...) for which no a*c + b, over (a, b) in forms,
+    is divisible by one of the primes.  Each a*c + b must exceed the largest sieving prime.
+    By default the primes are sieve_primes(bit length of start).
+    '''
+    if primes is None:
+        primes = sieve_primes(start.bit_length())
+    # first[k] is the index (relative to the current window) of the next term to strike out for
+    # the k-th (prime, form) pair, and stride[k] is how often that repeats.
+    first, stride = [], []
+    for s in primes:
+        for a, b in forms:
+            a_step = a * step % s
+            value = (a * start + b) % s
+            if a_step == 0:
+                if value == 0:
+                    return  # Every term is divisible by s.
+                continue
+            first.append(-value * pow(a_step, -1, s) % s)
+            stride.append(s)
+
+    offset = 0
+    while True:
+        flags = bytearray([1]) * window
+        for k, s in enumerate(stride):
+            i = first[k]
+            if i < window:
+                flags[i::s] = bytes((window - 1 - i) // s + 1)
+            first[k] = (i - window) % s  # Shift to the next window.
+        for i in range(window):
+            if flags[i]:
+                yield start + (offset + i) * step
+        offset += window
+
+def _random_odd(bits):
+    return _random.getrandbits(bits) | (1 << (bits - 1)) | 1
+
+def random_prime(bits):
+    '''
+    Return a random prime of exactly the given bit length.
+    '''
+    if bits < 2:
+        raise ValueError("primes need at least 2 bits")
+    if bits < 16:
+        while True:
+            n = _random.getrandbits(bits) | (1 << (bits - 1))
+            if is_prime(n):
+                return n
+    while True:
+        for n in sieved_progression(_random_odd(bits), 2):
+            if n.bit_length() > bits:
+                break  # Ran off the top: start again from a new random point.
+            if is_prime_no_small_factor(n):
+                return n
+
+def safe_prime(bits):
+    '''
+    Return a random safe prime p = 2q + 1 (q prime) of exactly the given bit length.
+    '''
+    if bits < 3:
+        raise ValueError("safe primes need at least 3 bits")
+    if bits < 18:
+        while True:
+            q = random_prime(bits - 1)
+            if is_prime(2*q + 1):
+                return 2*q + 1
+    while True:
+        for q in sieved_progression(_random_odd(bits - 1), 2, forms=((1, 0), (2, 1))):
+            if q.bit_length() > bits - 1:
+                break
+            p = 2*q + 1
+            # A cheap base-2 test on both halves first: most survivors fail one of them.
+            if strong_probable_prime(q, 2) and strong_probable_prime(p, 2):
+                if is_prime_no_small_factor(q) and is_prime_no_small_factor(p):
+                    return p
+
+def _prime_in_progression(start, step):
+    for n in sieved_progression(start, step):
+        if n >= 2 and is_prime_no_small_factor(n):
+            return n
+
+def strong_prime(bits):
+    '''
+    Return a random strong prime p of (exactly) the given bit length, using Gordon's algorithm:
+    p - 1 has a large prime factor r, p + 1 has a large prime factor s, and r - 1 has a large prime factor t.
+    '''
+    if bits < 64:
+        raise ValueError("strong primes need at least 64 bits")
+    while True:
+        # Keep r*s about 16 bits shorter than p, so the progression p0 + 2*j*r*s has thousands of
+        # terms of the right size to choose from.
+        half = bits // 2 - 8
+        s = random_prime(half)
+        t = random_prime(half - 16)
+        r = _prime_in_progression(2 * (_random.getrandbits(15) + 1) * t + 1, 2 * t)  # r = 1 (mod 2t), r > 2t
+        if r.bit_length() + s.bit_length() > bits - 12:
+            continue
+        rs = r * s
+        p0 = (2 * pow(s, r - 2, r) * s - 1) % (2 * rs)  # p0 = 1 (mod 2r) and p0 = -1 (mod s)
+        # Start p at a random point of the lower half of [2^(bits-1), 2^bits); the upper half is room to walk.
+        lo = (1 << (bits - 1)) + _random.getrandbits(bits - 2)
+        start = lo - (lo - p0) % (2 * rs)
+        if start < (1 << (bits - 1)):
+            start += 2 * rs
+        p = _prime_in_progression(start, 2 * rs)
+        if p.bit_length() == bits:
+            return p
+
+
+def _naive_random_prime(bits):
+    '''Draw random odd numbers until one is prime: what the sieve is compared against.'''
+    while True:
+        n = _random_odd(bits)
+        if is_prime(n):
+            return n
+
+if __name__ == '__main__':
+    sizes = [int(b) for b in sys.argv[1:]] or [1024, 2048]
+    for bits in sizes:
+        # Prime gaps vary a lot from one prime to the next, so timing a few generations is noisy.
+        # Scanning the same window of candidates with and without the sieve is not.
+        start = _random_odd(bits)
+        end = start + 2 * 8192
+        t = time.perf_counter()
+        naive = [n for n in range(start, end, 2) if is_prime(n)]
+        t_naive = time.perf_counter() - t
+        t = time.perf_counter()
+        sieved = [n for n in takewhile(lambda n: n < end, sieved_progression(start, 2)) if is_prime_no_small_factor(n)]
+        t_sieve = time.perf_counter() - t
+        assert naive == sieved
+        print(f"{bits}-bit, scanning 8192 odd candidates: test each {t_naive:.3f} s, "
+              f"sieve first {t_sieve:.3f} s ({t_naive / t_sieve:.2f}x)")
+
+        count = max(4, 8192 // bits)
+        for name, generate in (('naive random-and-test', _naive_random_prime), ('random_prime', random_prime),
+                               ('strong_prime', strong_prime), ('safe_prime', safe_prime)):
+            if name == 'safe_prime' and bits > 1024:
+                continue  # Safe primes need about bits times more candidates: minutes in pure Python.
+            t = time.perf_counter()
+            for _ in range(count):
+                p = generate(bits)
+                assert p.bit_length() == bits and is_prime(p)
+            print(f"  {name:<22} {(time.perf_counter() - t) / count:8.3f} s per prime (average of {count})")
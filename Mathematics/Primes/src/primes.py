@@ -1,5 +1,5 @@
-from Crypto.Util.number import isPrime, getPrime, GCD, inverse
 import random
+from math import gcd as GCD
 
 
 def is_prime(n):
@@ -14,8 +14,6 @@ def is_prime(n):
     return True
 
 
-print(is_prime(1345233))
-
 def is_prime(n):
     '''
     Checks whether the argument n is a prime number.
@@ -41,9 +39,15 @@ def fermat_test(n, k):
             return 'Composite'
     return 'Probably prime'
 
-print(fermat_test(2403, 12))
-p = getPrime(512)
-print(fermat_test(p, 100))
 
-print(f"561 is {fermat_test(561, 100)} but 561 % 3 = {561 % 3}")
-print(f"41041 is {fermat_test(41041, 100)} but 41041 % 11 = {41041 % 11}")
\ No newline at end of file
+if __name__ == '__main__':
+    from primegen import random_prime
+
+    print(is_prime(1345233))
+
+    print(fermat_test(2403, 12))
+    p = random_prime(512)
+    print(fermat_test(p, 100))
+
+    print(f"561 is {fermat_test(561, 100)} but 561 % 3 = {561 % 3}")
+    print(f"41041 is {fermat_test(41041, 100)} but 41041 % 11 = {41041 % 11}")
@@ -0,0 +1,165 @@
+'''
+A NumPy Sieve of Eratosthenes, and a persistent table of primes.
+
+The table of all primes below a limit is sieved once and written to disk as a flat array of
+uint32 (or uint64, past 2^32) integers.  Later processes memory-map the file instead of sieving
+again, so opening a table of the primes below 10^9 is instant, and the queries
+
+    pi(x), nth_prime(k), primes_in(lo, hi)
+
+are binary searches (np.searchsorted) into the mapped array.
+
+Usage:
+    python primetable.py [limit]
+'''
+
+import os
+import sys
+import time
+from math import isqrt
+
+import numpy as np
+
+from EratosthenesSieve import base_primes, odd_segments
+
+CACHE_DIR = os.environ.get('CRYPTOCAVE_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'cryptocave'))
+BUILD_SEGMENT_SIZE = 1 << 22  # Odd candidates per segment while building a table.
+
+def isprime_array(n):
+    '''
+    Return a NumPy boolean array of length n+1
+    with Trues at prime indices and Falses at composite indices.
+    '''
+    flags = np.ones(n+1, dtype=bool)
+    flags[:2] = False  # Zero and one are not prime.
+    flags[4::2] = False
+    for p in range(3, isqrt(n)+1, 2):
+        if flags[p]:
+            flags[p*p::2*p] = False  # Each slice assignment sieves every odd multiple of p at once.
+    return flags
+
+def where(flags):
+    '''
+    Vectorized version of EratosthenesSieve.where: the indices where flags is True.
+    '''
+    return np.flatnonzero(flags)
+
+def _dtype(limit):
+    return np.uint32 if limit <= 2**32 else np.uint64
+
+def sieve_to_file(limit, path):
+    '''
+    Write every prime below limit to path, as a flat little-endian array of uint32/uint64.
+    Only one segment of flags is held in memory at a time.
+    '''
+    dtype = np.dtype(_dtype(limit)).newbyteorder('<')
+    primes = base_primes(isqrt(max(limit-1, 0)))[1:]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        if limit > 2:
+            np.array([2], dtype=dtype).tofile(f)
+        for start, flags in odd_segments(0, limit, primes=primes, segment_size=BUILD_SEGMENT_SIZE):
+            offsets = np.flatnonzero(np.frombuffer(flags, dtype=np.uint8))
+            (start + 2*offsets).astype(dtype).tofile(f)
+    os.replace(tmp, path)  # Readers never see a half-written table.
+
+class PrimeTable:
+    '''
+    The primes below limit, held in a (usually memory-mapped) sorted NumPy array.
+    '''
+    def __init__(self, limit, primes):
+        self.limit = limit
+        self.primes = primes
+
+    def __repr__(self):
+        return f"PrimeTable(limit={self.limit}, primes={len(self.primes)})"
+
+    def __len__(self):
+        return len(self.primes)
+
+    @staticmethod
+    def path(limit, cache_dir=CACHE_DIR):
+        return os.path.join(cache_dir, f"primes_below_{limit}.{np.dtype(_dtype(limit)).name}")
+
+    @staticmethod
+    def open(limit, cache_dir=CACHE_DIR):
+        '''
+        Memory-map the table of primes below limit, sieving it into cache_dir first if needed.
+        '''
+        path = PrimeTable.path(limit, cache_dir)
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            sieve_to_file(limit, path)
+        dtype = np.dtype(_dtype(limit)).newbyteorder('<')
+        if os.path.getsize(path) == 0:
+            return PrimeTable(limit, np.empty(0, dtype=dtype))
+        return PrimeTable(limit, np.memmap(path, dtype=dtype, mode='r'))
+
+    def _check(self, x):
+        if x > self.limit:
+            raise ValueError(f"{x} is beyond the table limit {self.limit}")
+
+    def _search(self, x, side='left'):
+        x = max(x, 0)
+        if x > np.iinfo(self.primes.dtype).max:
+            return len(self.primes)  # Past every entry, e.g. x = 2^32 in a uint32 table.
+        # The key must have the table's dtype, otherwise NumPy casts (i.e. copies) the whole table.
+        return int(np.searchsorted(self.primes, self.primes.dtype.type(x), side=side))
+
+    def pi(self, x):
+        '''
+        The number of primes p <= x.
+        '''
+        self._check(x + 1)
+        return self._search(x, side='right')
+
+    def nth_prime(self, k):
+        '''
+        The k-th prime, counting from nth_prime(1) = 2.
+        '''
+        if not 1 <= k <= len(self.primes):
+            raise IndexError(f"the table only holds {len(self.primes)} primes")
+        return int(self.primes[k-1])
+
+    def primes_in(self, lo, hi):
+        '''
+        The primes in [lo, hi), as a read-only view into the table.
+        '''
+        self._check(hi)
+        return self.primes[self._search(lo):self._search(hi)]
+
+    def is_prime(self, n):
+        self._check(n + 1)
+        i = self._search(n)
+        return bool(i < len(self.primes) and self.primes[i] == n)
+
+_tables = {}
+
+def prime_table(limit, cache_dir=CACHE_DIR):
+    '''
+    The PrimeTable for limit, opened at most once per process.
+    '''
+    key = (limit, cache_dir)
+    if key not in _tables:
+        _tables[key] = PrimeTable.open(limit, cache_dir)
+    return _tables[key]
+
+
+if __name__ == '__main__':
+    limit = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+
+    start = time.perf_counter()
+    flags = isprime_array(10**7)
+    print(f"isprime_array(10^7): {len(where(flags))} primes in {time.perf_counter() - start:.3f} s")
+
+    built = os.path.exists(PrimeTable.path(limit))
+    start = time.perf_counter()
+    table = prime_table(limit)
+    print(f"{'opened' if built else 'built'} {table} in {time.perf_counter() - start:.3f} s")
+
+    start = time.perf_counter()
+    x = limit // 3
+    print(f"pi({x}) = {table.pi(x)}")
+    print(f"nth_prime(1000000) = {table.nth_prime(1000000)}")
+    print(f"primes_in({x}, {x + 100}) = {table.primes_in(x, x + 100).tolist()}")
+    print(f"queries took {1000*(time.perf_counter() - start):.3f} ms")
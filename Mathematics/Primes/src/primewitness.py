@@ -1,6 +1,4 @@
-from mpmath import *
 import random
-# The mpmath package allows us to compute with arbitrary precision!
 
 def prob_prime(N, witnesses):
     '''
@@ -8,34 +6,87 @@ def prob_prime(N, witnesses):
     N is an approximation of the size of the tested number.
     witnesses is the number of witnesses.
     '''
+    from mpmath import mp, log  # The mpmath package allows us to compute with arbitrary precision!
     mp.dps = witnesses # mp.dps is the number of digits of precision.  We adapt this as needed for input.
     prob_prime = 1 - (log(N) - 1) / (4**witnesses)
     print(str(100*prob_prime)+"% chance of primality") # Use str to convert mpmath float to string for printing.
-prob_prime(10**100, 50) # Chance of primality with 50 witnesses, if a 100-digit number is tested.
 
-def Miller_Rabin(p, base):
+def sliding_window_pow(base, exponent, modulus, window=4, trace=None):
+    '''
+    Computes base**exponent % modulus with the sliding-window method.
+    The odd powers base^1, base^3, ..., base^(2^window - 1) are precomputed, so a run of up to
+    `window` bits ending in a 1 costs one multiplication instead of one per 1-bit.
+    If trace is a list, every step is appended to it as ('square', value) or ('multiply', power, value).
+    '''
+    if exponent == 0:
+        return 1 % modulus
+    base %= modulus
+    odd_powers = [base]  # odd_powers[i] = base^(2i+1)
+    base_sq = base * base % modulus
+    for _ in range((1 << (window - 1)) - 1):
+        odd_powers.append(odd_powers[-1] * base_sq % modulus)
+
+    bits = bin(exponent)[2:]
+    result = None  # Squaring 1 is wasted work, so the first window just copies its odd power.
+    i = 0
+    while i < len(bits):
+        if bits[i] == '0':
+            result = result * result % modulus
+            if trace is not None:
+                trace.append(('square', result))
+            i += 1
+            continue
+        # Take the longest window bits[i:j] of at most `window` bits that ends in a 1.
+        j = min(i + window, len(bits))
+        while bits[j - 1] == '0':
+            j -= 1
+        power = int(bits[i:j], 2)
+        if result is None:
+            result = odd_powers[power >> 1]
+        else:
+            for _ in range(j - i):
+                result = result * result % modulus
+                if trace is not None:
+                    trace.append(('square', result))
+            result = result * odd_powers[power >> 1] % modulus
+        if trace is not None:
+            trace.append(('multiply', power, result))
+        i = j
+    return 1 % modulus if result is None else result
+
+def Miller_Rabin(p, base, trace=None):
     '''
     Tests whether p is prime, using the given base.
     The result False implies that p is definitely not prime.
     The result True implies that p **might** be prime.
     It is not a perfect test!
+
+    We write p-1 = 2^r * d with d odd and compute base^d.  Reaching base^(p-1) then takes r more
+    squarings, and those are exactly the steps where a nontrivial square root of one (ROO) can show up.
+    If trace is a list, the steps (from sliding_window_pow, then each squaring) are appended to it.
+    Without a trace, base^d is computed by the built-in pow, so the instrumentation costs nothing.
     '''
-    result = 1
-    exponent = p-1
-    modulus = p
-    bitstring = bin(exponent)[2:] # Chop off the '0b' part of the binary expansion of exponent
-    for bit in bitstring: # Iterates through the "letters" of the string.  Here the letters are '0' or '1'.
-        sq_result = result*result % modulus  # We need to compute this in any case.
-        if sq_result == 1:
-            if (result != 1) and (result != exponent):  # Note that exponent is congruent to -1, mod p.
-                return False  # a ROO violation occurred, so p is not prime
-        if bit == '0':
-            result = sq_result 
-        if bit == '1':
-            result = (sq_result * base) % modulus
+    if p < 2:
+        return False
+    if p in (2, 3):
+        return True
+    exponent = p-1  # Note that exponent is congruent to -1, mod p.
+    r = (exponent & -exponent).bit_length() - 1
+    d = exponent >> r
+    if trace is None:
+        result = pow(base, d, p)
+    else:
+        result = sliding_window_pow(base, d, p, trace=trace)
+    for _ in range(r):
+        sq_result = result*result % p
+        if trace is not None:
+            trace.append(('square', sq_result))
+        if sq_result == 1 and (result != 1) and (result != exponent):
+            return False  # a ROO violation occurred, so p is not prime
+        result = sq_result
     if result != 1:
         return False  # a FLT violation occurred, so p is not prime.
-    
+
     return True  # If we made it this far, no violation occurred and p might be prime.
 
 # We implement the Miller-Rabin test for primality in the `is_prime` function below.
@@ -89,10 +140,14 @@ def is_prime(p, witnesses=50):  # witnesses is a parameter with a default value.
             return verdict # The witnesses 2,3,5,7,11,17,19,23 suffice.
         verdict = verdict and Miller_Rabin(p,29) and Miller_Rabin(p,31) and Miller_Rabin(p,37)
         return verdict # The witnesses 2,3,5,7,11,17,19,23,29,31,37 suffice for testing up to 2^64. 
-    
-print(is_prime(1000000000000066600000000000001))  # This is Belphegor's prime.
-for p in range(1,1000):
-    if is_prime(p):  # We only need to check these p.
-        M = 2**p - 1 # A candidate for a Mersenne prime.
-        if is_prime(M):
-            print("2^{} - 1 = {} is a Mersenne prime.".format(p,M))
\ No newline at end of file
+
+
+if __name__ == '__main__':
+    prob_prime(10**100, 50) # Chance of primality with 50 witnesses, if a 100-digit number is tested.
+
+    print(is_prime(1000000000000066600000000000001))  # This is Belphegor's prime.
+    for p in range(1,1000):
+        if is_prime(p):  # We only need to check these p.
+            M = 2**p - 1 # A candidate for a Mersenne prime.
+            if is_prime(M):
+                print("2^{} - 1 = {} is a Mersenne prime.".format(p,M))
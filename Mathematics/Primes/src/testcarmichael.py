@@ -1,23 +1,150 @@
-from sympy import isprime, gcd
-from sympy.ntheory.factor_ import factorint
+'''
+Carmichael numbers: composite n with a^(n-1) = 1 (mod n) for every a coprime to n.
 
-def is_carmichael(n):
-    # Carmichael numbers must be square-free and composite
-    if isprime(n):
-        return False
+    is_carmichael(n)          -> bool, without factoring n in the usual case
+    carmichael_numbers(bound) -> every Carmichael number below bound
+
+Korselt's criterion: n is a Carmichael number exactly when n is composite, square-free, and
+p - 1 divides n - 1 for every prime p dividing n.
+
+is_carmichael runs the cheap necessary conditions first (n odd, not prime by Baillie-PSW, Korselt
+for the small factors, a few Fermat tests), which throw out almost every n.  What passes is
+factored with factorization.factorint, helped by the fact that a^(n-1) = 1 for the bases tried:
+square roots of 1 split a Carmichael number at once, whatever the size of its factors.
+
+carmichael_numbers follows Pinch: for a product P = p1 p2 ... p(k-1) of increasing primes, with
+L = lcm(pi - 1), the last prime q of n = Pq must satisfy q = 1/P (mod L) and q - 1 | P - 1, so
+only a few q per prefix need a primality test.  Prefixes come from the prime table, and are spread
+over worker processes by their first two primes.
+
+Usage:
+    python testcarmichael.py [bound] [max_workers]
+'''
 
-    factors = factorint(n)
-    # Must be square-free (no repeated prime factors)
-    if any(exp > 1 for exp in factors.values()):
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import gcd, isqrt, lcm
+
+from factorization import factorint, trial_division
+from primality import is_prime
+
+FERMAT_BASES = (2, 3, 5, 7, 11, 13)
+PREFIX_CHUNK = 64  # Second primes per task in carmichael_numbers.
+
+def is_carmichael(n, time_budget=60):
+    '''
+    Return True if n is a Carmichael number.
+    Raises TimeoutError if the factorization of a number that passes every cheap test
+    takes more than time_budget seconds.
+    '''
+    if n < 561 or not n & 1:  # 561 is the smallest Carmichael number, and they are all odd.
         return False
+    if is_prime(n):
+        return False
+
+    def korselt(factors):
+        return all(e == 1 and (n - 1) % (p - 1) == 0 for p, e in factors.items())
 
-    # For all prime divisors p of n, p - 1 must divide n - 1
-    for p in factors.keys():
-        if (n - 1) % (p - 1) != 0:
+    small, m = trial_division(n)
+    if not korselt(small):
+        return False
+    for a in FERMAT_BASES:
+        if gcd(a, n) == 1 and pow(a, n - 1, n) != 1:
             return False
+    return m == 1 or korselt(factorint(m, time_budget, exponent=n - 1))
+
+_primes = None  # The prefix primes, set once per worker by _init_worker.
+
+def _init_worker(bound):
+    global _primes
+    from primetable import prime_table
+    _primes = [int(p) for p in prime_table(isqrt(bound // 3) + 2).primes[1:]]
+
+def _last_primes(P, L, p, bound):
+    '''The primes q > p with Pq < bound a Carmichael number, for the prefix P with L = lcm(pi - 1).'''
+    found = []
+    hi = min((bound - 1) // P, P)  # q - 1 divides P - 1, so q <= P.
+    if hi <= p:
+        return found
+    if (P - 1) // p < (hi - p) // L:
+        # Fewer divisors to try than terms of the progression: q - 1 = (P - 1)/t.
+        for t in range(max(1, (P - 1) // (hi - 1)), (P - 1) // p + 1):
+            if (P - 1) % t == 0:
+                q = (P - 1) // t + 1
+                if p < q <= hi and P * q % L == 1 and is_prime(q):
+                    found.append(q)
+    else:
+        q = pow(P, -1, L)
+        q += (p - q) // L * L + L  # The first q > p in the progression.
+        while q <= hi:
+            if (P - 1) % (q - 1) == 0 and is_prime(q):
+                found.append(q)
+            q += L
+    return found
+
+def _extend(P, L, i, bound, found):
+    '''Every Carmichael number below bound made of the prefix P (whose largest prime is _primes[i]) and larger primes.'''
+    for j in range(i + 1, len(_primes)):
+        p = _primes[j]
+        if P * p * p >= bound:
+            break
+        if L % p == 0 or gcd(P, p - 1) != 1:
+            continue  # p divides some pi - 1, or some pi divides p - 1: no Carmichael number has both.
+        Pp, Lp = P * p, lcm(L, p - 1)
+        found += [Pp * q for q in _last_primes(Pp, Lp, p, bound)]
+        _extend(Pp, Lp, j, bound, found)
+
+def _prefix_task(args):
+    i, lo, hi, bound = args
+    p1 = _primes[i]
+    found = []
+    for j in range(lo, hi):
+        p = _primes[j]
+        if p1 * p * p >= bound:
+            break
+        if (p - 1) % p1 == 0:
+            continue
+        P, L = p1 * p, lcm(p1 - 1, p - 1)
+        found += [P * q for q in _last_primes(P, L, p, bound)]
+        _extend(P, L, j, bound, found)
+    return found
+
+def carmichael_numbers(bound, max_workers=None):
+    '''
+    Return the sorted list of Carmichael numbers below bound, searching on max_workers processes
+    (by default, one per core).
+    '''
+    if bound <= 561:
+        return []
+    _init_worker(bound)
+    tasks = []
+    for i, p1 in enumerate(_primes):
+        if p1 ** 3 >= bound:
+            break
+        for lo in range(i + 1, len(_primes), PREFIX_CHUNK):
+            if p1 * _primes[lo] ** 2 >= bound:
+                break
+            tasks.append((i, lo, min(lo + PREFIX_CHUNK, len(_primes)), bound))
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(_prefix_task, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bound,)) as pool:
+            results = list(pool.map(_prefix_task, tasks, chunksize=4))
+    return sorted(n for found in results for n in found)
+
 
-    return True
+if __name__ == '__main__':
+    # Test the given number
+    n = 862978178865374730139845690278208781767603294507602119220311853
+    start = time.perf_counter()
+    print(is_carmichael(n), f"({time.perf_counter() - start:.3f} s)")
 
-# Test the given number
-# n = 862978178865374730139845690278208781767603294507602119220311853
-print(is_carmichael(n))
\ No newline at end of file
+    bound = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = time.perf_counter()
+    found = carmichael_numbers(bound, max_workers)
+    print(f"{len(found)} Carmichael numbers below {bound} in {time.perf_counter() - start:.2f} s: {found[:8]} ...")
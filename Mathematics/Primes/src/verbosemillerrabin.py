@@ -1,33 +1,20 @@
-def Miller_Rabin(p, base):
-    '''
-    Tests whether p is prime, using the given base.
-    The result False implies that p is definitely not prime.
-    The result True implies that p **might** be prime.
-    It is not a perfect test!
-    '''
-    result = 1
-    exponent = p-1
-    modulus = p
-    bitstring = bin(exponent)[2:] # Chop off the '0b' part of the binary expansion of exponent
-    for bit in bitstring: # Iterates through the "letters" of the string.  Here the letters are '0' or '1'.
-        sq_result = result*result % modulus  # We need to compute this in any case.
-        if sq_result == 1:
-            if (result != 1) and (result != exponent):  # Note that exponent is congruent to -1, mod p.
-                return False  # a ROO violation occurred, so p is not prime
-        if bit == '0':
-            result = sq_result 
-        if bit == '1':
-            result = (sq_result * base) % modulus
-    if result != 1:
-        return False  # a FLT violation occurred, so p is not prime.
-    
-    return True  # If we made it this far, no violation occurred and p might be prime.
-print(Miller_Rabin(101,6))
+from liars import liar_counts
+from primewitness import Miller_Rabin
 
-for witness in range(2,20):
-    MR = Miller_Rabin(41041, witness) # 
-    if MR: 
-        print("{} is a bad witness.".format(witness))
-    else:
-        print("{} detects that 41041 is not prime.".format(witness))
 
+if __name__ == '__main__':
+    print(Miller_Rabin(101,6))
+
+    for witness in range(2,20):
+        MR = Miller_Rabin(41041, witness) # 
+        if MR: 
+            print("{} is a bad witness.".format(witness))
+        else:
+            print("{} detects that 41041 is not prime.".format(witness))
+    print("41041 has {strong} strong liars in all (and {fermat} Fermat liars).".format(**liar_counts(41041)))
+
+    # The same test for the witness 2, step by step.
+    trace = []
+    Miller_Rabin(41041, 2, trace=trace)
+    for step in trace:
+        print(*step)
@@ -1,28 +1,12 @@
-
 from copy import copy
 import random
 
 
 ############################  Base field arithmetic
 PRIME = 433
-def base_egcd(a, b):
-    r0, r1 = a, b
-    s0, s1 = 1, 0
-    t0, t1 = 0, 1
-    
-    while r1 != 0:
-        q, r2 = divmod(r0, r1)
-        r0, s0, t0, r1, s1, t1 = \
-            r1, s1, t1, \
-            r2, s0 - s1*q, t0 - t1*q
-
-    d = r0
-    s = s0
-    t = t0
-    return d, s, t
 def base_inverse(a):
-    _, b, _ = base_egcd(a, PRIME)
-    return b if b >= 0 else b+PRIME
+    # 0 has no inverse; it is mapped to 0, as the extended Euclidean version did.
+    return pow(a, -1, PRIME) if a % PRIME else 0
 def base_add(a, b):
     return (a + b) % PRIME
 def base_sub(a, b):
@@ -45,41 +29,27 @@ def expand_to_match(A, B):
     else:
         return A, B
 
-assert( expand_to_match([1,1], [])  == ([1,1], [0,0]) )
-assert( expand_to_match([1,1], [1]) == ([1,1], [1,0]) )
 def canonical(A):
     for i in reversed(range(len(A))):
         if A[i] != 0:
             return A[:i+1]
     return []
 
-assert( canonical([ ]) == [] )
-assert( canonical([0]) == [] )
-assert( canonical([0,0]) == [] )
-assert( canonical([0,1,2]) == [0,1,2] )
-assert( canonical([0,1,2,0,0]) == [0,1,2] )
 def lc(A):
     B = canonical(A)
     return B[-1]
 
-assert( lc([0,1,2,0]) == 2 )
 def deg(A):
     return len(canonical(A)) - 1
 
-assert( deg([ ]) == -1 )
-assert( deg([0]) == -1 )
-assert( deg([1,0]) == 0 )
-assert( deg([0,0,1]) == 2 )
 def poly_add(A, B):
     F, G = expand_to_match(A, B)
     return canonical([ base_add(f, g) for f, g in zip(F, G) ])
 
-assert( poly_add([1,2,3], [2,1]) == [3,3,3] )
 def poly_sub(A, B):
     F, G = expand_to_match(A, B)
     return canonical([ base_sub(f, g) for f, g in zip(F, G) ])
 
-assert( poly_sub([1,2,3], [1,2]) == [0,0,3] )
 def poly_scalarmul(A, b):
     return canonical([ base_mul(a, b) for a in A ])
 
@@ -101,10 +71,6 @@ def poly_divmod(A, B):
             R[i+j] = base_sub(R[i+j], base_mul(Q[i], B[j]))
     return canonical(Q), canonical(R)
 
-A = [7,4,5,4]
-B = [1,0,1]
-Q, R = poly_divmod(A, B)
-assert( poly_add(poly_mul(Q, B), R) == A )
 def poly_div(A, B):
     Q, _ = poly_divmod(A, B)
     return Q
@@ -145,13 +111,6 @@ def lagrange_interpolation(xs, ys):
         term = poly_scalarmul(ls[i], ys[i])
         poly = poly_add(poly, term)
     return poly
-F = [1,2,3]
-
-xs = [10,20,30,40]
-ys = [ poly_eval(F, x) for x in xs ]
-
-G = lagrange_interpolation(xs, ys)
-assert( G == F )
 
 
 ##############################################    Reed-Solomon decoding via EGCD
@@ -181,18 +140,6 @@ def poly_egcd(A, B):
     T = poly_scalardiv(T0, c)
     return D, S, T
 
-A = [2,0,2]
-B = [1,3]
-G = [1,0,0,1]
-assert( poly_gcd(A, B) == [1] )
-assert( poly_gcd(A, G) == [1] )
-assert( poly_gcd(B, G) == [1] )
-
-F = poly_mul(G, A)
-H = poly_mul(G, B)
-D, S, T = poly_egcd(F, H)
-assert( D == poly_gcd(F, H) )
-assert( D == poly_add(poly_mul(F, S), poly_mul(H, T)) )
 def poly_eea(F, H):
     R0, R1 = F, H
     S0, S1 = [1], []
@@ -289,21 +236,75 @@ def shamir_robust_reconstruct(shares):
     error_indices = [ i for i,v in enumerate( poly_eval(error_locator, p) for p in POINTS ) if v == 0 ]
 
     return secret, error_indices
-# sharing
-original_shares = shamir_share(5)
-print("Original shares: %s" % original_shares)
-
-# introduce faults in shares
-received_shares = copy(original_shares)
-indices = random.sample(range(N), MAX_MISSING + MAX_MANIPULATED)
-missing, manipulated = indices[:MAX_MISSING], indices[MAX_MISSING:]
-for i in missing:     received_shares[i] = None
-for i in manipulated: received_shares[i] = random.randrange(PRIME)
-print("Received shares: %s" % received_shares)
-
-# robust reconstruction
-recovered_secret, error_indices = shamir_robust_reconstruct(received_shares)
-assert(recovered_secret == 5)
-assert(sorted(error_indices) == sorted(manipulated))
-
- 
\ No newline at end of file
+
+
+############################ Self-checks of the field and polynomial arithmetic
+def _self_check():
+    assert( expand_to_match([1,1], [])  == ([1,1], [0,0]) )
+    assert( expand_to_match([1,1], [1]) == ([1,1], [1,0]) )
+
+    assert( canonical([ ]) == [] )
+    assert( canonical([0]) == [] )
+    assert( canonical([0,0]) == [] )
+    assert( canonical([0,1,2]) == [0,1,2] )
+    assert( canonical([0,1,2,0,0]) == [0,1,2] )
+
+    assert( lc([0,1,2,0]) == 2 )
+
+    assert( deg([ ]) == -1 )
+    assert( deg([0]) == -1 )
+    assert( deg([1,0]) == 0 )
+    assert( deg([0,0,1]) == 2 )
+
+    assert( poly_add([1,2,3], [2,1]) == [3,3,3] )
+
+    assert( poly_sub([1,2,3], [1,2]) == [0,0,3] )
+
+    A = [7,4,5,4]
+    B = [1,0,1]
+    Q, R = poly_divmod(A, B)
+    assert( poly_add(poly_mul(Q, B), R) == A )
+
+    F = [1,2,3]
+
+    xs = [10,20,30,40]
+    ys = [ poly_eval(F, x) for x in xs ]
+
+    G = lagrange_interpolation(xs, ys)
+    assert( G == F )
+
+    A = [2,0,2]
+    B = [1,3]
+    G = [1,0,0,1]
+    assert( poly_gcd(A, B) == [1] )
+    assert( poly_gcd(A, G) == [1] )
+    assert( poly_gcd(B, G) == [1] )
+
+    F = poly_mul(G, A)
+    H = poly_mul(G, B)
+    D, S, T = poly_egcd(F, H)
+    assert( D == poly_gcd(F, H) )
+    assert( D == poly_add(poly_mul(F, S), poly_mul(H, T)) )
+
+
+if __name__ == '__main__':
+    _self_check()
+
+    # sharing
+    original_shares = shamir_share(5)
+    print("Original shares: %s" % original_shares)
+
+    # introduce faults in shares
+    received_shares = copy(original_shares)
+    indices = random.sample(range(N), MAX_MISSING + MAX_MANIPULATED)
+    missing, manipulated = indices[:MAX_MISSING], indices[MAX_MISSING:]
+    for i in missing:     received_shares[i] = None
+    for i in manipulated: received_shares[i] = random.randrange(PRIME)
+    print("Received shares: %s" % received_shares)
+
+    # robust reconstruction
+    recovered_secret, error_indices = shamir_robust_reconstruct(received_shares)
+    assert(recovered_secret == 5)
+    assert(sorted(error_indices) == sorted(manipulated))
+
+
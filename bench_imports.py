@@ -0,0 +1,109 @@
+'''
+Import-time benchmark for every Python module in the cave.
+
+Each module is imported in a fresh interpreter (so nothing is cached between
+runs) with its own directory on sys.path, exactly as the scripts import their
+siblings. Importing a module must not run demos, self-checks or prime
+generation, so every import should cost a few milliseconds at most.
+
+Some modules import NumPy or concurrent.futures at the top.  Each module's
+time includes those imports; the cost of each dependency on its own is
+measured once, in a fresh interpreter too, and reported separately, so the
+module's own work is its time minus the dependencies it pulled in.  The budget
+applies to that own time.
+
+Usage:
+    python bench_imports.py [budget_ms]
+'''
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+BUDGET_MS = 50.0
+DEPENDENCIES = ('numpy', 'concurrent.futures')  # Reported separately from the modules that import them.
+
+# Runs inside the child interpreter: time a single import of the given file.
+# Prints the time and the DEPENDENCIES loaded on the way.
+_PROBE = '''
+import importlib.util, sys, time
+path = sys.argv[1]
+sys.path.insert(0, sys.argv[2])
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("_probe", path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print((time.perf_counter() - start) * 1000, *[d for d in sys.argv[3:] if d in sys.modules])
+'''
+
+# Runs inside the child interpreter: time the import of one dependency.
+_DEPENDENCY_PROBE = '''
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print((time.perf_counter() - start) * 1000)
+'''
+
+
+def modules():
+    '''Every tracked Python source file, skipping this benchmark itself.'''
+    for path in sorted(ROOT.rglob('*.py')):
+        if path.name == Path(__file__).name or '.git' in path.parts:
+            continue
+        yield path
+
+
+def _run(*args):
+    result = subprocess.run([sys.executable, '-c', *args], capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {args[1]} failed:\n{result.stderr}")
+    return result.stdout.strip().splitlines()[-1].split()
+
+
+def import_time_ms(path):
+    '''
+    Return the time (in ms) it takes to import path in a fresh interpreter, dependencies
+    included, and the DEPENDENCIES it loaded.
+    '''
+    ms, *loaded = _run(_PROBE, str(path), str(path.parent), *DEPENDENCIES)
+    return float(ms), loaded
+
+
+def dependency_times_ms():
+    '''The import time (in ms) of each installed dependency, each in a fresh interpreter.'''
+    times = {}
+    for name in DEPENDENCIES:
+        try:
+            times[name] = float(_run(_DEPENDENCY_PROBE, name)[0])
+        except RuntimeError:
+            pass
+    return times
+
+
+if __name__ == '__main__':
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    dependencies = dependency_times_ms()
+    for name, ms in dependencies.items():
+        print(f"{'(dependency) ' + name:<55} {ms:8.2f} ms")
+    print(f"{'':<55} {'total':>11} {'own':>11}")
+    slow = []
+    for path in modules():
+        name = str(path.relative_to(ROOT))
+        try:
+            total, loaded = import_time_ms(path)
+        except RuntimeError as err:
+            # A missing optional dependency is reported, not counted as slow.
+            print(f"{name:<55} skipped ({str(err).strip().splitlines()[-1]})")
+            continue
+        ms = max(total - sum(dependencies.get(d, 0) for d in loaded), 0)
+        flag = '' if ms <= budget else '  <-- over budget'
+        note = f"  (with {', '.join(loaded)})" if loaded else ''
+        print(f"{name:<55} {total:8.2f} ms {ms:8.2f} ms{flag}{note}")
+        if ms > budget:
+            slow.append(name)
+
+    if slow:
+        print(f"\n{len(slow)} module(s) took longer than {budget} ms to import.")
+        sys.exit(1)
+    print(f"\nAll modules imported in under {budget} ms.")